@@ -0,0 +1,322 @@
+"""
+Assignment 10: Retrieval Evaluation for the Product Similarity Engine
+
+This script measures how well product search works before top_k, the index
+type or vector compression are changed:
+1. Embedding the products and labeled queries (cached in eval_embeddings.npz)
+2. Computing exact ground truth with NumPy matrix products
+3. Searching with each index configuration (float32, float16, int8, PCA)
+4. Reporting recall@k, MRR, nDCG@k, QPS and memory, with the Pareto front
+
+Usage:
+    python evaluate.py
+    python evaluate.py --k 1 3 5 --distractors 100000 --pca 256 64 --output eval_report.json
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+
+from main import SAMPLE_PRODUCTS
+
+
+def product_text(product):
+    # Same text the engine embeds in upsert_products
+    return f"{product['title']} {product['description']}"
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingCache:
+    """Embeddings keyed by model and text, stored in one .npz file"""
+
+    def __init__(self, path, model):
+        self.path = path
+        self.model = model
+        self.vectors = {}
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    def embed_all(self, texts, embed):
+        """Return unit-length embeddings of texts, calling embed only for new texts"""
+        missing = [text for text in dict.fromkeys(texts) if self._key(text) not in self.vectors]
+        for text in missing:
+            self.vectors[self._key(text)] = np.asarray(embed(text), dtype=np.float32)
+        if missing:
+            self.save()
+            print(f"Embedded {len(missing)} new texts ({len(texts) - len(missing)} from cache)")
+        return normalize([self.vectors[self._key(text)] for text in texts])
+
+    def save(self):
+        buffer = io.BytesIO()
+        np.savez(buffer, keys=np.array(list(self.vectors)), vectors=np.stack(list(self.vectors.values())))
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(buffer.getvalue())
+        os.replace(temp_path, self.path)
+
+
+# -- Index configurations -----------------------------------------------------
+
+class ExactIndex:
+    """Brute-force float32 inner product (cosine on unit vectors)"""
+
+    name = "exact-float32"
+
+    def __init__(self, corpus):
+        self.vectors = np.ascontiguousarray(corpus, dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.vectors.nbytes
+
+    def scores(self, query):
+        return self.vectors @ query
+
+
+def blocked_scores(stored, query, block_rows=4096):
+    """Inner products of compressed rows with a float32 query.
+
+    NumPy has no BLAS kernel for float16 or int8, so rows are decoded into a
+    small float32 buffer one block at a time and scored with float32 BLAS.
+    """
+    scores = np.empty(len(stored), dtype=np.float32)
+    buffer = np.empty((min(block_rows, len(stored)), stored.shape[1]), dtype=np.float32)
+    for start in range(0, len(stored), block_rows):
+        block = stored[start:start + block_rows]
+        np.copyto(buffer[:len(block)], block, casting="unsafe")
+        np.matmul(buffer[:len(block)], query, out=scores[start:start + len(block)])
+    return scores
+
+
+class Float16Index(ExactIndex):
+    """Vectors stored as float16: half the memory of float32"""
+
+    name = "float16"
+
+    def __init__(self, corpus):
+        self.vectors = np.ascontiguousarray(corpus, dtype=np.float16)
+
+    def scores(self, query):
+        return blocked_scores(self.vectors, query)
+
+
+class Int8Index:
+    """Per-dimension symmetric scalar quantization to int8: a quarter of the memory"""
+
+    name = "int8"
+
+    def __init__(self, corpus):
+        self.scale = np.abs(corpus).max(axis=0) / 127.0
+        self.scale[self.scale == 0] = 1.0
+        self.codes = np.round(corpus / self.scale).astype(np.int8)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scale.nbytes
+
+    def scores(self, query):
+        # The scale is folded into the query, so codes are decoded without rescaling
+        return blocked_scores(self.codes, (query * self.scale).astype(np.float32))
+
+
+class PCAIndex:
+    """Vectors projected onto their top principal directions"""
+
+    def __init__(self, corpus, dimensions):
+        dimensions = min(dimensions, corpus.shape[1])
+        self.name = f"pca-{dimensions}"
+        # Eigenvectors of the d x d second-moment matrix; cheaper than an SVD of the corpus
+        _, eigenvectors = np.linalg.eigh(corpus.T @ corpus)
+        self.projection = np.ascontiguousarray(eigenvectors[:, ::-1][:, :dimensions], dtype=np.float32)
+        self.vectors = np.ascontiguousarray(corpus @ self.projection, dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.vectors.nbytes + self.projection.nbytes
+
+    def scores(self, query):
+        return self.vectors @ (query @ self.projection)
+
+
+def top_k(scores, k):
+    """Row indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+# -- Metrics ------------------------------------------------------------------
+
+def recall_at_k(results, truth, k):
+    """Share of the exact top k that the index also returned in its top k"""
+    return float(np.mean([len(set(r[:k]) & set(t[:k])) / len(t[:k]) for r, t in zip(results, truth)]))
+
+
+def mrr(results, grades):
+    """Mean reciprocal rank of the first relevant result"""
+    total = 0.0
+    for result, relevant in zip(results, grades):
+        for rank, row in enumerate(result, 1):
+            if row in relevant:
+                total += 1.0 / rank
+                break
+    return total / len(results)
+
+
+def ndcg_at_k(results, grades, k):
+    """Normalized discounted cumulative gain with graded relevance"""
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    values = []
+    for result, relevant in zip(results, grades):
+        gains = np.array([2.0 ** relevant.get(row, 0) - 1 for row in result[:k]])
+        ideal = np.array(sorted((2.0 ** g - 1 for g in relevant.values()), reverse=True)[:k])
+        ideal_dcg = float(ideal @ discounts[:len(ideal)])
+        values.append(float(gains @ discounts[:len(gains)]) / ideal_dcg if ideal_dcg else 0.0)
+    return float(np.mean(values))
+
+
+def evaluate_index(index, queries, truth, grades, ks, min_seconds=0.5):
+    """Search every query one at a time, as the engine does, and score the results"""
+    k_max = max(ks)
+    results = [top_k(index.scores(query), k_max).tolist() for query in queries]
+
+    # Repeat the query set until enough time has passed for a stable QPS
+    searched = 0
+    started = time.perf_counter()
+    while True:
+        for query in queries:
+            top_k(index.scores(query), k_max)
+        searched += len(queries)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+
+    row = {"index": index.name, "memory_bytes": int(index.nbytes), "qps": searched / elapsed, "mrr": mrr(results, grades)}
+    for k in ks:
+        row[f"recall@{k}"] = recall_at_k(results, truth, k)
+        row[f"ndcg@{k}"] = ndcg_at_k(results, grades, k)
+    return row
+
+
+def pareto_front(rows, quality):
+    """Mark rows that no other row beats on quality, QPS and memory at once"""
+    for row in rows:
+        row["pareto"] = not any(
+            other[quality] >= row[quality] and other["qps"] >= row["qps"]
+            and other["memory_bytes"] <= row["memory_bytes"]
+            and (other[quality] > row[quality] or other["qps"] > row["qps"]
+                 or other["memory_bytes"] < row["memory_bytes"])
+            for other in rows
+        )
+    return rows
+
+
+def print_report(rows, ks):
+    columns = [f"recall@{k}" for k in ks] + ["mrr"] + [f"ndcg@{k}" for k in ks]
+    print(f"\n{'='*60}")
+    print("RETRIEVAL EVALUATION")
+    print(f"{'='*60}")
+    print(f"{'index':<16}" + "".join(f"{c:>10}" for c in columns) + f"{'qps':>10}{'memory':>12}  pareto")
+    for row in rows:
+        print(
+            f"{row['index']:<16}" + "".join(f"{row[c]:>10.3f}" for c in columns)
+            + f"{row['qps']:>10.0f}{row['memory_bytes'] / 1e6:>10.2f}MB  {'*' if row['pareto'] else ''}"
+        )
+    print(f"{'='*60}")
+    print("* not beaten by another index on recall, QPS and memory together")
+
+
+def load_labels(path):
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    queries = []
+    for item in data["queries"]:
+        relevant = item["relevant"]
+        # A list means every listed product is relevant with grade 1
+        if isinstance(relevant, list):
+            relevant = {product_id: 1 for product_id in relevant}
+        queries.append({"query": item["query"], "relevant": relevant})
+    return data.get("products", SAMPLE_PRODUCTS), queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate recall, ranking quality, speed and memory of product search.")
+    parser.add_argument("--labels", default="eval_queries.json", help="Labeled queries (and optionally products)")
+    parser.add_argument("--cache", default="eval_embeddings.npz", help="Embedding cache file")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5], help="Cutoffs for recall@k and nDCG@k")
+    parser.add_argument("--pca", type=int, nargs="*", default=[256, 64], help="PCA dimensions to evaluate")
+    parser.add_argument("--distractors", type=int, default=0,
+                        help="Add this many synthetic products near the real ones to measure at catalogue scale")
+    parser.add_argument("--distractor-noise", type=float, default=1.0, help="Distance of distractors from real products")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    # Step 1: Load labeled queries and embed products and queries (cached)
+    products, labeled = load_labels(args.labels)
+    from config import AZURE_DEPLOYMENT_NAME
+
+    engine = None
+
+    def embed(text):
+        nonlocal engine
+        if engine is None:
+            from main import ProductSimilarityEngine
+
+            engine = ProductSimilarityEngine()
+        return engine.get_embedding(text)
+
+    cache = EmbeddingCache(args.cache, AZURE_DEPLOYMENT_NAME)
+    corpus = cache.embed_all([product_text(product) for product in products], embed)
+    queries = cache.embed_all([item["query"] for item in labeled], embed)
+
+    # Optional synthetic distractors: noisy copies of real products
+    if args.distractors:
+        rng = np.random.default_rng(args.seed)
+        base = corpus[rng.integers(len(corpus), size=args.distractors)]
+        noise = rng.standard_normal(base.shape, dtype=np.float32) * (args.distractor_noise / np.sqrt(corpus.shape[1]))
+        corpus = np.vstack([corpus, normalize(base + noise)])
+    print(f"Evaluating {len(queries)} queries against {len(corpus)} products ({corpus.shape[1]} dimensions)")
+
+    # Step 2: Exact ground truth for all queries with one matrix product
+    ks = sorted(set(min(k, len(corpus)) for k in args.k))
+    k_max = max(ks)
+    exact_scores = queries @ corpus.T
+    truth = np.argsort(-exact_scores, axis=1)[:, :k_max].tolist()
+    rows_by_id = {product["id"]: row for row, product in enumerate(products)}
+    grades = [
+        {rows_by_id[product_id]: grade for product_id, grade in item["relevant"].items() if product_id in rows_by_id}
+        for item in labeled
+    ]
+
+    # Step 3: Build and evaluate each index configuration
+    indexes = [ExactIndex(corpus), Float16Index(corpus), Int8Index(corpus)]
+    indexes += [PCAIndex(corpus, dimensions) for dimensions in args.pca]
+    rows = [evaluate_index(index, queries, truth, grades, ks) for index in indexes]
+
+    # Step 4: Report, marking the recall / QPS / memory Pareto front
+    pareto_front(rows, f"recall@{k_max}")
+    print_report(rows, ks)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"queries": len(queries), "products": len(corpus), "k": ks, "results": rows}, file, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
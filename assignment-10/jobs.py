@@ -0,0 +1,60 @@
+"""
+Queue product similarity work as background jobs.
+
+Job kinds:
+- product_demo: run the full demo (create index, upsert, sample queries)
+- upsert_products: embed and upsert the sample products
+- search_products: {"query": "...", "top_k": 3} -> matching product ids and scores
+
+Usage:
+    python jobs.py submit-samples
+    python jobs.py submit search_products '{"query": "warm winter clothing", "top_k": 3}' --priority 5
+    python jobs.py work --workers 4 --until-empty
+    python jobs.py result 1
+"""
+
+import threading
+
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.jobqueue import run_cli
+from main import ProductSimilarityEngine
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Create the engine and connect to the index once, shared by all workers"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            engine = ProductSimilarityEngine()
+            engine.create_index()
+            _engine = engine
+    return _engine
+
+
+def demo_job(job):
+    return get_engine().run_demo()
+
+
+def upsert_job(job):
+    products = get_engine().upsert_products()
+    return {"upserted": [product["id"] for product in products]}
+
+
+def search_job(job):
+    query = job.payload["query"]
+    results = get_engine().search_similar_products(query, top_k=job.payload.get("top_k", 3))
+    return {"query": query, "matches": [{"id": match.id, "score": match.score} for match in results.matches]}
+
+
+HANDLERS = {
+    "product_demo": demo_job,
+    "upsert_products": upsert_job,
+    "search_products": search_job,
+}
+SAMPLES = {"product_demo": [{}]}
+
+if __name__ == "__main__":
+    run_cli(HANDLERS, samples=SAMPLES)
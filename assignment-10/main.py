@@ -15,6 +15,9 @@ from pinecone import Pinecone, ServerlessSpec
 from openai import AzureOpenAI
 import logging
 
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.metrics import metrics
+
 # Import configuration
 try:
     from config import *
@@ -33,6 +36,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Sample product dataset as specified in the assignment
+SAMPLE_PRODUCTS = [
+    {"id": "prod1", "title": "Red T-Shirt", "description": "Comfortable cotton t-shirt in bright red"},
+    {"id": "prod2", "title": "Blue Jeans", "description": "Stylish denim jeans with relaxed fit"},
+    {"id": "prod3", "title": "Black Leather Jacket", "description": "Genuine leather jacket with classic style"},
+    {"id": "prod4", "title": "White Sneakers", "description": "Comfortable sneakers perfect for daily wear"},
+    {"id": "prod5", "title": "Green Hoodie", "description": "Warm hoodie made of organic cotton"},
+]
+
 class ProductSimilarityEngine:
     """Main class for handling product similarity operations using Pinecone"""
     
@@ -106,10 +118,12 @@ class ProductSimilarityEngine:
     def get_embedding(self, text):
         """Generate embedding for given text using Azure OpenAI"""
         try:
-            response = self.openai_client.embeddings.create(
-                input=text,
-                model=os.getenv("AZURE_DEPLOYMENT_NAME")
-            )
+            with metrics.timer("embedding"):
+                response = self.openai_client.embeddings.create(
+                    input=text,
+                    model=os.getenv("AZURE_DEPLOYMENT_NAME")
+                )
+            metrics.add_tokens(response.usage, operation="embedding")
             return response.data[0].embedding
         except Exception as e:
             logger.error(f"Error generating embedding for text '{text}': {e}")
@@ -118,14 +132,7 @@ class ProductSimilarityEngine:
     def upsert_products(self):
         """Upsert sample product vectors into the index"""
         try:
-            # Sample product dataset as specified in the assignment
-            products = [
-                {"id": "prod1", "title": "Red T-Shirt", "description": "Comfortable cotton t-shirt in bright red"},
-                {"id": "prod2", "title": "Blue Jeans", "description": "Stylish denim jeans with relaxed fit"},
-                {"id": "prod3", "title": "Black Leather Jacket", "description": "Genuine leather jacket with classic style"},
-                {"id": "prod4", "title": "White Sneakers", "description": "Comfortable sneakers perfect for daily wear"},
-                {"id": "prod5", "title": "Green Hoodie", "description": "Warm hoodie made of organic cotton"},
-            ]
+            products = SAMPLE_PRODUCTS
             
             logger.info("Generating embeddings for products...")
             vectors = []
@@ -139,7 +146,9 @@ class ProductSimilarityEngine:
                 
             # Upsert vectors to the index
             logger.info("Upserting vectors to Pinecone index...")
-            self.index.upsert(vectors=vectors)
+            with metrics.timer("upsert"):
+                self.index.upsert(vectors=vectors)
+            metrics.inc("vectors_upserted", len(vectors))
             logger.info(f"Successfully upserted {len(vectors)} product vectors")
             
             return products
@@ -158,11 +167,12 @@ class ProductSimilarityEngine:
             logger.info("Query embedding generated successfully")
             
             # Query the index
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=False
-            )
+            with metrics.timer("retrieval", top_k=top_k):
+                results = self.index.query(
+                    vector=query_embedding,
+                    top_k=top_k,
+                    include_metadata=False
+                )
             
             logger.info(f"Query completed. Found {len(results.matches)} matches")
             return results
@@ -199,7 +209,7 @@ class ProductSimilarityEngine:
         print(f"\n{'='*60}")
         
     def run_demo(self):
-        """Run the complete demonstration"""
+        """Run the complete demonstration and return the matches for each query"""
         try:
             logger.info("Starting Assignment 10 Demo...")
             
@@ -219,19 +229,24 @@ class ProductSimilarityEngine:
             ]
             
             # Step 4: Perform similarity searches for each query
+            matches = {}
             for query in sample_queries:
                 logger.info(f"\nProcessing query: {query}")
                 
                 # Search for similar products
-                results = self.search_similar_products(query, top_k=3)
+                with metrics.timer("search"):
+                    results = self.search_similar_products(query, top_k=3)
                 
                 # Display results
                 self.display_results(query, results, products)
+                matches[query] = [{"id": match.id, "score": match.score} for match in results.matches]
                 
                 # Add delay between queries for better readability
                 time.sleep(2)
                 
             logger.info("Demo completed successfully!")
+            logger.info(f"Timings:\n{metrics.report()}")
+            return matches
             
         except Exception as e:
             logger.error(f"Error running demo: {e}")
@@ -256,8 +271,9 @@ def main():
         # Initialize the engine
         engine = ProductSimilarityEngine()
         
-        # Run the demo
-        engine.run_demo()
+        # Run the demo (profiled when METRICS_PROFILE is set)
+        with metrics.profile("assignment_10_demo"):
+            engine.run_demo()
         
     except Exception as e:
         logger.error(f"Assignment failed: {e}")
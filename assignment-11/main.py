@@ -9,12 +9,17 @@ This script implements a Langchain-based AI agent that can:
 """
 
 import os
+import time
 from langchain.tools import tool
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_openai import AzureChatOpenAI
 from langchain_community.utilities import OpenWeatherMapAPIWrapper
 from langchain_tavily import TavilySearch
 from langgraph.prebuilt import create_react_agent
 
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.metrics import metrics
+
 # Import configuration
 try:
     from config import (
@@ -29,6 +34,43 @@ except ImportError:
     print("Error: Please copy config_template.py to config.py and fill in your API keys")
     exit(1)
 
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Record tool call and LLM call timings and token usage in shared metrics"""
+
+    def __init__(self):
+        self._started = {}
+
+    def _start(self, run_id, name):
+        self._started[run_id] = (time.perf_counter(), name)
+
+    def _finish(self, run_id, timer_name, failed=False):
+        started, name = self._started.pop(run_id, (None, None))
+        if started is None:
+            return
+        labels = {"tool": name} if timer_name == "tool_call" else {}
+        metrics.observe(timer_name, time.perf_counter() - started, **labels)
+        if failed:
+            metrics.inc(f"{timer_name}_errors", **labels)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id, "tool_call")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "tool_call", failed=True)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, "llm_call")
+        metrics.add_tokens((response.llm_output or {}).get("token_usage"), operation="agent")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "llm_call", failed=True)
+
 def setup_environment():
     """Setup environment variables from config"""
     os.environ["AZURE_OPENAI_ENDPOINT"] = AZURE_OPENAI_ENDPOINT
@@ -100,6 +142,7 @@ def run_conversation(agent):
     print("=" * 50)
     
     messages = []
+    callbacks = [MetricsCallbackHandler()]
     
     # Mock user questions for automatic input (as required by assignment)
     mock_questions = [
@@ -116,6 +159,7 @@ def run_conversation(agent):
         
         if user_input.lower() == "exit":
             print("Goodbye! Thank you for using the AI Assistant.")
+            print(f"\nTimings:\n{metrics.report()}")
             break
         
         # Add user message to conversation history
@@ -123,7 +167,8 @@ def run_conversation(agent):
         
         try:
             # Get response from agent
-            response = agent.invoke({"messages": messages})
+            with metrics.timer("agent_turn"):
+                response = agent.invoke({"messages": messages}, config={"callbacks": callbacks})
             
             # Extract the last message content
             if response and "messages" in response and response["messages"]:
@@ -181,8 +226,9 @@ def main():
     print("Agent setup complete! Starting conversation...")
     print()
     
-    # Run the conversation
-    run_conversation(agent)
+    # Run the conversation (profiled when METRICS_PROFILE is set)
+    with metrics.profile("assignment_11_conversation"):
+        run_conversation(agent)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,55 @@
+"""
+Queue satellite image classification as background jobs.
+
+Each classify_image job downloads one image and classifies it; failures
+(download errors, API errors) are retried by the queue. Results are stored
+in the job database, so a restarted run only classifies the images that are
+not done yet.
+
+Usage:
+    python jobs.py submit-samples
+    python jobs.py submit classify_image '{"url": "https://example.com/scene.jpg"}' --priority 5
+    python jobs.py work --workers 4 --until-empty
+    python jobs.py status
+"""
+
+from functools import lru_cache
+
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.jobqueue import run_cli
+from main import SAMPLE_IMAGES, classify_image, load_image_from_url, setup_llm
+
+
+@lru_cache(maxsize=None)
+def get_llm():
+    """Set up the LLM once and share it between worker threads"""
+    llm = setup_llm()
+    if llm is None:
+        raise RuntimeError("Failed to setup LLM")
+    return llm
+
+
+def classify_job(job):
+    """Classify the image at job.payload["url"]; raise so the queue retries failures"""
+    image_url = job.payload["url"]
+    image_data_base64, image = load_image_from_url(image_url)
+    if not image_data_base64:
+        raise RuntimeError(f"Could not load image from {image_url}")
+
+    result = classify_image(get_llm(), image_data_base64)
+    if result is None:
+        raise RuntimeError(f"Classification failed for {image_url}")
+    return {
+        "url": image_url,
+        "result": result.result,
+        "accuracy": result.accuracy,
+        "width": image.size[0],
+        "height": image.size[1],
+    }
+
+
+HANDLERS = {"classify_image": classify_job}
+SAMPLES = {"classify_image": [{"url": url} for url in SAMPLE_IMAGES]}
+
+if __name__ == "__main__":
+    run_cli(HANDLERS, samples=SAMPLES)
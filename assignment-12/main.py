@@ -5,12 +5,16 @@ This application classifies satellite images as either "Cloudy" or "Clear" using
 It accepts satellite images as input and returns a classification label with confidence score.
 """
 
+import io
 import os
 import base64
 import requests
 from PIL import Image
 from langchain_openai import AzureChatOpenAI
 from pydantic import BaseModel, Field
+
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.metrics import metrics
 from config import (
     AZURE_OPENAI_ENDPOINT,
     AZURE_OPENAI_API_KEY,
@@ -23,6 +27,13 @@ os.environ["AZURE_OPENAI_ENDPOINT"] = AZURE_OPENAI_ENDPOINT
 os.environ["AZURE_OPENAI_API_KEY"] = AZURE_OPENAI_API_KEY
 os.environ["AZURE_DEPLOYMENT_NAME"] = AZURE_DEPLOYMENT_NAME
 
+# Sample satellite images for testing (auto-input as required)
+SAMPLE_IMAGES = [
+    "https://images.pexels.com/photos/53594/blue-clouds-day-fluffy-53594.jpeg?cs=srgb&dl=pexels-pixabay-53594.jpg&fm=jpg",
+    "https://images.pexels.com/photos/1287145/pexels-photo-1287145.jpeg?auto=compress&cs=tinysrgb&w=1260&h=750&dpr=1",
+    "https://images.pexels.com/photos/1287146/pexels-photo-1287146.jpeg?auto=compress&cs=tinysrgb&w=1260&h=750&dpr=1"
+]
+
 # Output Schema for structured response
 class WeatherResponse(BaseModel):
     accuracy: float = Field(description="The accuracy of the result as a percentage")
@@ -49,14 +60,18 @@ def load_image_from_url(image_url):
     """Load image from URL and convert to base64"""
     try:
         print(f"Loading image from: {image_url}")
-        response = requests.get(image_url)
-        response.raise_for_status()
+        with metrics.timer("image_download"):
+            response = requests.get(image_url)
+            response.raise_for_status()
         
         image_bytes = response.content
+        metrics.add_bytes("image_download", len(image_bytes))
         image_data_base64 = base64.b64encode(image_bytes).decode("utf-8")
         
-        # Verify image can be opened
-        image = Image.open(requests.get(image_url, stream=True).raw)
+        # Verify image can be opened (decoded from the bytes already downloaded)
+        with metrics.timer("image_decode"):
+            image = Image.open(io.BytesIO(image_bytes))
+            image.load()
         print(f"Image loaded successfully: {image.size[0]}x{image.size[1]} pixels")
         
         return image_data_base64, image
@@ -92,7 +107,9 @@ def classify_image(llm, image_data_base64):
         ]
         
         # Call Azure OpenAI for classification
-        result = llm.invoke(message)
+        with metrics.timer("classify_image"):
+            result = llm.invoke(message)
+        metrics.add_bytes("classify_image_payload", len(image_data_base64))
         return result
     except Exception as e:
         print(f"Error during classification: {e}")
@@ -133,12 +150,7 @@ def main():
         return
     print("LLM setup successful!")
     
-    # Sample satellite images for testing (auto-input as required)
-    sample_images = [
-        "https://images.pexels.com/photos/53594/blue-clouds-day-fluffy-53594.jpeg?cs=srgb&dl=pexels-pixabay-53594.jpg&fm=jpg",
-        "https://images.pexels.com/photos/1287145/pexels-photo-1287145.jpeg?auto=compress&cs=tinysrgb&w=1260&h=750&dpr=1",
-        "https://images.pexels.com/photos/1287146/pexels-photo-1287146.jpeg?auto=compress&cs=tinysrgb&w=1260&h=750&dpr=1"
-    ]
+    sample_images = SAMPLE_IMAGES
     
     print(f"\nProcessing {len(sample_images)} sample images...")
     
@@ -165,6 +177,9 @@ def main():
     
     print("All images processed successfully!")
     print("="*70)
+    print(f"Timings:\n{metrics.report()}")
 
 if __name__ == "__main__":
-    main()
+    # Profiled when METRICS_PROFILE is set
+    with metrics.profile("assignment_12"):
+        main()
@@ -1,15 +1,10 @@
-import PyPDF2
-import sys
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.pdf_text import extract_text
 
 def read_pdf(file_path):
-    """Read PDF file and extract text content"""
+    """Read PDF file and extract text content (parallel, cached per file version)"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+        return extract_text(file_path)
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return None
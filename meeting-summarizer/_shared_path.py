@@ -0,0 +1,14 @@
+"""Put the repository root on sys.path so the shared/ helpers are importable.
+
+Scripts in this project import it first among their project imports:
+
+    import _shared_path  # noqa: F401
+    from shared.metrics import metrics
+"""
+
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
@@ -0,0 +1,225 @@
+"""Batch summarization of many transcripts with a shared async client.
+
+Usage:
+    python batch.py data/ --output results.jsonl
+    python batch.py "recordings/2024-*/*.txt" --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from openai import AsyncOpenAI
+
+from chunking import chunk_transcript, count_tokens, group_summaries
+from main import SYSTEM_PROMPT, get_config
+from results_store import ResultsStore, content_hash
+from transcripts import find_transcripts
+
+JSON_INSTRUCTIONS = (
+    "Respond with a JSON object with the keys \"summary\" (a short paragraph of "
+    "the key points), \"decisions\" (a list of strings) and \"action_items\" (a "
+    "list of objects with \"owner\", \"task\" and \"due\" keys; use null when "
+    "unknown)."
+)
+
+# Largest reply allowed when a structured summary is retried after truncation
+MAX_JSON_TOKENS = 4000
+
+
+def _parse_result(content):
+    data = json.loads(content)
+    return {
+        "summary": str(data.get("summary", "")).strip(),
+        "decisions": list(data.get("decisions") or []),
+        "action_items": list(data.get("action_items") or []),
+    }
+
+
+class BatchSummarizer:
+    """Summarize transcripts concurrently over one pooled HTTP connection set"""
+
+    def __init__(self, config, store, concurrency=8):
+        self.config = config
+        self.store = store
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+        )
+        self.client = AsyncOpenAI(
+            api_key=config.openai_api_key,
+            base_url=config.openai_api_base,
+            http_client=self.http_client,
+        )
+        self._in_flight = {}
+
+    async def _complete_json(self, user_prompt, max_tokens):
+        # A reply cut off at max_tokens is not valid JSON, so retry it with a
+        # larger limit instead of failing the transcript on json.loads
+        while True:
+            async with self.semaphore:
+                response = await self.client.chat.completions.create(
+                    model=self.config.openai_model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=0.3,
+                    max_tokens=max_tokens,
+                    response_format={"type": "json_object"},
+                )
+            choice = response.choices[0]
+            if choice.finish_reason != "length":
+                return _parse_result(choice.message.content)
+            if max_tokens >= MAX_JSON_TOKENS:
+                raise ValueError(f"Structured summary did not fit in {max_tokens} tokens")
+            max_tokens = min(max_tokens * 2, MAX_JSON_TOKENS)
+
+    async def summarize(self, transcript):
+        chunks = chunk_transcript(
+            transcript,
+            max_tokens=self.config.chunk_tokens,
+            overlap_tokens=self.config.chunk_overlap,
+            model=self.config.openai_model,
+        )
+        if len(chunks) <= 1:
+            return await self._complete_json(
+                f"Summarize the following meeting transcript.\n{JSON_INSTRUCTIONS}\n\n{transcript}",
+                max_tokens=800,
+            )
+
+        # Map over chunks, then reduce the structured partial results
+        partials = await asyncio.gather(*(
+            self._complete_json(
+                f"The following is part {i} of {len(chunks)} of a meeting transcript. "
+                f"Summarize only this part.\n{JSON_INSTRUCTIONS}\n\n{chunk}",
+                max_tokens=600,
+            )
+            for i, chunk in enumerate(chunks, 1)
+        ))
+        return await self.merge(partials)
+
+    async def _merge_group(self, partials):
+        return await self._complete_json(
+            "Merge the following partial summaries of one meeting into a single "
+            "summary, removing duplicates caused by overlapping parts.\n"
+            f"{JSON_INSTRUCTIONS}\n\n{json.dumps(partials, indent=1)}",
+            max_tokens=800,
+        )
+
+    async def merge(self, partials):
+        # Reduce in stages while the partial results overflow a chunk, with at
+        # least two per request (see chunking.group_summaries)
+        model = self.config.openai_model
+        while len(partials) > 1 and count_tokens(json.dumps(partials), model) > self.config.chunk_tokens:
+            texts = [json.dumps(partial) for partial in partials]
+            groups = group_summaries(texts, self.config.chunk_tokens, model)
+            partials = await asyncio.gather(*(
+                self._merge_group([json.loads(text) for text in group]) for group in groups
+            ))
+            if len(partials) == 1:
+                return partials[0]
+        return await self._merge_group(partials)
+
+    async def process_file(self, path):
+        started = time.perf_counter()
+        with open(path, "r") as file:
+            transcript = file.read()
+        digest = content_hash(transcript)
+
+        model = self.config.openai_model
+        cached = self.store.get(digest, model)
+        if cached is not None:
+            return {**cached, "source": path, "cached": True, "seconds": 0.0}
+
+        # Identical transcripts in the same batch share one request
+        if digest not in self._in_flight:
+            self._in_flight[digest] = asyncio.ensure_future(self.summarize(transcript))
+        try:
+            result = await self._in_flight[digest]
+        finally:
+            self._in_flight.pop(digest, None)
+
+        if self.store.get(digest, model) is None:
+            self.store.put(digest, path, model, result)
+        return {
+            "content_hash": digest,
+            "source": path,
+            "model": model,
+            **result,
+            "cached": False,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    async def close(self):
+        await self.client.close()
+        await self.http_client.aclose()
+
+
+async def run_batch(paths, config, store_path, output_path, concurrency, include_cached=False):
+    store = ResultsStore(store_path)
+    summarizer = BatchSummarizer(config, store, concurrency)
+    summarized = cached = failed = 0
+    try:
+        tasks = [asyncio.ensure_future(summarizer.process_file(path)) for path in paths]
+        with open(output_path, "a") as output:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    record = await future
+                except Exception as e:
+                    failed += 1
+                    print(f"Error summarizing transcript: {e}")
+                    continue
+                if record["cached"]:
+                    cached += 1
+                    # Cached results are already in the output of an earlier run
+                    if not include_cached:
+                        continue
+                else:
+                    summarized += 1
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+    finally:
+        await summarizer.close()
+        store.close()
+    return summarized, cached, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize many meeting transcripts concurrently.")
+    parser.add_argument("inputs", nargs="+", help="Transcript files, directories or glob patterns")
+    parser.add_argument("--pattern", default="*.txt", help="File pattern used inside directories")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL file to append results to")
+    parser.add_argument("--store", default="results.db", help="SQLite results store")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent API requests")
+    parser.add_argument("--include-cached", action="store_true",
+                        help="Also write results already in the store to the output")
+    args = parser.parse_args()
+
+    config = get_config()
+
+    paths = find_transcripts(args.inputs, args.pattern)
+    if not paths:
+        print("No transcripts found.")
+        return
+
+    print(f"Summarizing {len(paths)} transcripts with concurrency {args.concurrency}...")
+    started = time.perf_counter()
+    summarized, cached, failed = asyncio.run(
+        run_batch(paths, config, args.store, args.output, args.concurrency, args.include_cached)
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"Done in {elapsed:.1f}s: {summarized} summarized, {cached} already in store, "
+        f"{failed} failed. Results written to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Token-aware transcript chunking used by the map-reduce summarizer."""
+
+# Rough average for English text when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+_encodings = {}
+
+
+def _get_encoding(model):
+    # tiktoken is imported on first use to keep module import fast, and is
+    # optional: without it token counts fall back to a character estimate
+    if model in _encodings:
+        return _encodings[model]
+    try:
+        import tiktoken
+    except ImportError:
+        _encodings[model] = None
+        return None
+    try:
+        _encodings[model] = tiktoken.encoding_for_model(model)
+    except KeyError:
+        _encodings[model] = tiktoken.get_encoding("o200k_base")
+    return _encodings[model]
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    """Count tokens in text, estimating from length if tiktoken is missing"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text))
+
+
+def _split_long_line(line, max_tokens, model):
+    """Hard-split a single line that does not fit in one chunk"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        step = max_tokens * CHARS_PER_TOKEN
+        return [line[i:i + step] for i in range(0, len(line), step)]
+    tokens = encoding.encode(line)
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def chunk_transcript(transcript, max_tokens=3000, overlap_tokens=200, model="gpt-4o-mini"):
+    """Split a transcript into chunks of at most max_tokens tokens.
+
+    Chunks break on line boundaries so speaker turns stay intact, and the
+    trailing lines of each chunk (up to overlap_tokens) are repeated at the
+    start of the next one so context is not lost at the seams.
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+
+    lines = []
+    for line in transcript.splitlines(keepends=True):
+        line_tokens = count_tokens(line, model)
+        if line_tokens > max_tokens:
+            for piece in _split_long_line(line, max_tokens, model):
+                lines.append((piece, count_tokens(piece, model)))
+        else:
+            lines.append((line, line_tokens))
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for line, line_tokens in lines:
+        if current and current_tokens + line_tokens > max_tokens:
+            chunks.append("".join(text for text, _ in current))
+
+            # Carry the tail of this chunk over as overlap
+            overlap = []
+            overlap_size = 0
+            for text, tokens in reversed(current):
+                if overlap_size + tokens > overlap_tokens or overlap_size + tokens + line_tokens > max_tokens:
+                    break
+                overlap.insert(0, (text, tokens))
+                overlap_size += tokens
+            current = overlap
+            current_tokens = overlap_size
+
+        current.append((line, line_tokens))
+        current_tokens += line_tokens
+
+    if current:
+        chunks.append("".join(text for text, _ in current))
+    return chunks
+
+
+def group_summaries(summaries, max_tokens, model="gpt-4o-mini"):
+    """Pack consecutive summaries into groups for one stage of the reduce step.
+
+    Groups hold at most max_tokens tokens where possible, but always at
+    least two summaries, so every stage at least halves the number of
+    summaries and the staged reduction ends even when max_tokens is close
+    to the length of one merged summary.
+    """
+    groups, current, current_tokens = [], [], 0
+    for summary in summaries:
+        tokens = count_tokens(summary, model)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if len(current) == 1 and groups:
+        groups[-1].append(current[0])
+    elif current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,84 @@
+"""Queue meeting summaries as background jobs.
+
+Each summarize_meeting job checkpoints its partial (per-chunk) summaries, so
+a job that crashes or is retried only pays for the chunks it had not
+finished. Jobs are keyed by the transcript content, so submitting the same
+transcript twice returns the existing job and its stored summary.
+
+Usage:
+    python jobs.py submit summarize_meeting '{"path": "data/meeting_transcript.txt"}'
+    python jobs.py work --workers 4 --until-empty
+    python jobs.py result 1
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.jobqueue import payload_key, run_cli
+from chunking import chunk_transcript
+from main import _complete, get_config, merge_summaries, summarize_chunk
+from results_store import content_hash
+
+
+def read_transcript(payload):
+    if "transcript" in payload:
+        return payload["transcript"]
+    with open(payload["path"], "r") as file:
+        return file.read()
+
+
+def summarize_job(job):
+    # Same map-reduce as summarize_meeting, with each chunk summary saved
+    # to the job checkpoint as soon as it arrives
+    config = get_config()
+    transcript = read_transcript(job.payload)
+    chunks = chunk_transcript(
+        transcript,
+        max_tokens=config.chunk_tokens,
+        overlap_tokens=config.chunk_overlap,
+        model=config.openai_model,
+    )
+    if len(chunks) <= 1:
+        user_prompt = f"Summarize the following meeting transcript with key points, decisions, and action items:\n\n{transcript}"
+        return _complete(user_prompt, max_tokens=500)
+
+    # Checkpoints from an earlier attempt are only reused for the same chunking
+    checkpoint = job.checkpoint or {}
+    digest = content_hash(transcript)
+    partials = checkpoint.get("partials", {}) if checkpoint.get("content_hash") == digest else {}
+    missing = [i for i in range(len(chunks)) if str(i) not in partials]
+    if len(missing) < len(chunks):
+        print(f"Job {job.id}: resuming with {len(chunks) - len(missing)}/{len(chunks)} chunks already summarized")
+
+    with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+        futures = {
+            executor.submit(summarize_chunk, chunks[i], i + 1, len(chunks)): i for i in missing
+        }
+        # Keep every chunk that succeeds even if another one fails
+        error = None
+        for future in as_completed(futures):
+            try:
+                partials[str(futures[future])] = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            job.save_checkpoint({"content_hash": digest, "partials": partials})
+    if error is not None:
+        raise error
+
+    return merge_summaries([partials[str(i)] for i in range(len(chunks))])
+
+
+def transcript_key(kind, payload):
+    # Key on the transcript text, not its path, so edited files are re-summarized
+    try:
+        return f"{kind}:{content_hash(read_transcript(payload))}"
+    except OSError:
+        return payload_key(kind, payload)
+
+
+HANDLERS = {"summarize_meeting": summarize_job}
+SAMPLES = {"summarize_meeting": [{"path": "data/meeting_transcript.txt"}]}
+
+if __name__ == "__main__":
+    run_cli(HANDLERS, idempotency_key=transcript_key, samples=SAMPLES)
@@ -1,42 +1,167 @@
-from openai import OpenAI
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
 from settings import settings
+from chunking import chunk_transcript, count_tokens, group_summaries
+from streaming import stream_summaries
 
-# Step 1: Initialize Settings
-config = settings()
-config.load_from_env()
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes meeting transcripts."
 
-# Step 2: Initialize OpenAI Client
-client = OpenAI(
-    api_key=config.openai_api_key,
-)
+# Step 1: Initialize Settings (on first use, then reused)
+@lru_cache(maxsize=None)
+def get_config():
+    config = settings()
+    config.load_from_env()
+    return config
 
-# Step 3: Load transcript text (example: read from a file)
-with open("data/meeting_transcript.txt", "r") as file:
-    transcript = file.read()
+# Step 2: Initialize OpenAI Client (on first use, then reused)
+@lru_cache(maxsize=None)
+def get_client():
+    # Imported here so importing this module stays cheap
+    from openai import OpenAI
 
-def summarize_meeting(transcript):
-    # Step 4: Craft prompt for summarization
-    system_prompt = "You are a helpful assistant that summarizes meeting transcripts."
-    user_prompt = f"Summarize the following meeting transcript with key points, decisions, and action items:\n\n{transcript}"
-
-    # Call OpenAI API to generate summary
-    response = client.chat.completions.create(
-        model=config.openai_model,
-        messages=[
-            {
-                "role": "system",
-                "content": system_prompt
-            },
-            {
-                "role": "user",
-                "content": user_prompt
-            }
-        ],
-        temperature=0.3,
-        max_tokens=500
+    return OpenAI(
+        api_key=get_config().openai_api_key,
     )
+
+@lru_cache(maxsize=None)
+def get_metrics():
+    # Imported on first use as well; the metrics module pulls in cProfile and pstats
+    from shared.metrics import metrics
+
+    return metrics
+
+def _complete(user_prompt, max_tokens):
+    metrics = get_metrics()
+    with metrics.timer("llm_call"):
+        response = get_client().chat.completions.create(
+            model=get_config().openai_model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens
+        )
+    metrics.add_tokens(response.usage, operation="summarize")
     return response.choices[0].message.content.strip() # type: ignore
 
-# Step 5: Generate and print summary
-summary = summarize_meeting(transcript)
-print(f"Meeting Summary: \n\n{summary}")
\ No newline at end of file
+def summarize_chunk(chunk, index, total):
+    # Map step: summarize one part of the transcript on its own
+    user_prompt = (
+        f"The following is part {index} of {total} of a meeting transcript. "
+        "Summarize this part with key points, decisions, and action items "
+        "(include owners and deadlines where stated). Only report what appears "
+        f"in this part:\n\n{chunk}"
+    )
+    return _complete(user_prompt, max_tokens=400)
+
+def merge_group(partial_summaries):
+    # Merge one group of partial summaries with a single request
+    if len(partial_summaries) > 1:
+        combined = "\n\n".join(
+            f"Part {i}:\n{summary}" for i, summary in enumerate(partial_summaries, 1)
+        )
+    else:
+        combined = partial_summaries[0]
+
+    user_prompt = (
+        "Merge the following partial meeting summaries into one summary with "
+        "sections for key points, decisions, and action items. Remove duplicates "
+        "caused by overlapping parts and keep owners and deadlines:\n\n"
+        f"{combined}"
+    )
+    return _complete(user_prompt, max_tokens=500)
+
+def merge_summaries(partial_summaries):
+    # Reduce step: combine partial summaries into a single summary
+    config = get_config()
+    # Reduce in stages while the partial summaries overflow a chunk; every
+    # stage merges at least two summaries per request, so it always ends
+    while (len(partial_summaries) > 1 and
+           count_tokens("\n\n".join(partial_summaries), config.openai_model) > config.chunk_tokens):
+        groups = group_summaries(partial_summaries, config.chunk_tokens, config.openai_model)
+        with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+            partial_summaries = list(executor.map(merge_group, groups))
+        if len(partial_summaries) == 1:
+            return partial_summaries[0]
+    return merge_group(partial_summaries)
+
+def summarize_meeting(transcript):
+    with get_metrics().timer("summarize_meeting"):
+        # Step 3: Split the transcript into token-bounded, overlapping chunks
+        config = get_config()
+        chunks = chunk_transcript(
+            transcript,
+            max_tokens=config.chunk_tokens,
+            overlap_tokens=config.chunk_overlap,
+            model=config.openai_model,
+        )
+
+        # Short transcripts fit in a single request
+        if len(chunks) <= 1:
+            user_prompt = f"Summarize the following meeting transcript with key points, decisions, and action items:\n\n{transcript}"
+            return _complete(user_prompt, max_tokens=500)
+
+        # Summarize chunks in parallel over a bounded worker pool, keeping order
+        with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+            partial_summaries = list(executor.map(
+                summarize_chunk, chunks, range(1, len(chunks) + 1), [len(chunks)] * len(chunks)
+            ))
+
+        return merge_summaries(partial_summaries)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a meeting transcript.")
+    parser.add_argument("transcript_path", nargs="?", default="data/meeting_transcript.txt",
+                        help="Transcript file to summarize, or '-' to read from stdin")
+    parser.add_argument("--stream", action="store_true",
+                        help="Update a rolling summary as new transcript segments arrive")
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep tailing the transcript file for new text (implies --stream)")
+    parser.add_argument("--segment-tokens", type=int, default=1000,
+                        help="Approximate tokens of new text per incremental update")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds between checks for new text when following")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="Stop following after this many seconds without new text")
+    return parser.parse_args(argv)
+
+def run(args):
+    if args.stream or args.follow or args.transcript_path == "-":
+        # Streaming mode: only new text is sent to the model on each update
+        for summary in stream_summaries(
+            args.transcript_path,
+            _complete,
+            segment_tokens=args.segment_tokens,
+            follow=args.follow,
+            poll_interval=args.poll_interval,
+            idle_timeout=args.idle_timeout,
+            model=get_config().openai_model,
+        ):
+            print(f"Meeting Summary (so far): \n\n{summary}\n")
+    else:
+        with open(args.transcript_path, "r") as file:
+            transcript = file.read()
+        summary = summarize_meeting(transcript)
+        print(f"Meeting Summary: \n\n{summary}")
+
+def main(argv=None):
+    # Step 4: Parse command line options
+    args = parse_args(argv)
+
+    # Step 5: Generate and print summary (profiled when METRICS_PROFILE is set)
+    metrics = get_metrics()
+    with metrics.profile("summarize_meeting"):
+        run(args)
+    print(f"Timings:\n{metrics.report()}")
+
+if __name__ == "__main__":
+    main()
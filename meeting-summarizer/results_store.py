@@ -0,0 +1,83 @@
+"""SQLite store for structured meeting summaries keyed by transcript content hash and model."""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+
+def content_hash(text):
+    """Stable hash of a transcript's content, independent of its file name"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    source TEXT NOT NULL,
+    model TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    decisions TEXT NOT NULL,
+    action_items TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, model)
+)
+"""
+
+
+class ResultsStore:
+    """Persist summaries so the same transcript is never summarized twice by one model"""
+
+    def __init__(self, path="results.db"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def _migrate(self):
+        # Stores created before the model was part of the key are rebuilt
+        # with the new key; their rows keep the model they were made with
+        key = [row[1] for row in self.connection.execute("PRAGMA table_info(results)") if row[5]]
+        if key == ["content_hash"]:
+            self.connection.execute("ALTER TABLE results RENAME TO results_old")
+            self.connection.execute(SCHEMA)
+            self.connection.execute("INSERT INTO results SELECT * FROM results_old")
+            self.connection.execute("DROP TABLE results_old")
+
+    def get(self, digest, model):
+        row = self.connection.execute(
+            "SELECT source, model, summary, decisions, action_items FROM results "
+            "WHERE content_hash = ? AND model = ?",
+            (digest, model),
+        ).fetchone()
+        if row is None:
+            return None
+        source, model, summary, decisions, action_items = row
+        return {
+            "content_hash": digest,
+            "source": source,
+            "model": model,
+            "summary": summary,
+            "decisions": json.loads(decisions),
+            "action_items": json.loads(action_items),
+        }
+
+    def put(self, digest, source, model, result):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                digest,
+                source,
+                model,
+                result["summary"],
+                json.dumps(result["decisions"]),
+                json.dumps(result["action_items"]),
+                time.time(),
+            ),
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
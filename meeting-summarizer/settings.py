@@ -3,6 +3,13 @@ class settings:
         self.openai_api_key = "your_openai_api_key_here"
         self.openai_api_base = "https://api.openai.com/v1"
         self.openai_model = "gpt-4o-mini"
+        self.chunk_tokens = 3000
+        self.chunk_overlap = 200
+        self.max_workers = 4
+        self.embedding_model = "text-embedding-3-small"
+        self.embedding_batch_size = 256
+        self.index_chunk_tokens = 400
+        self.index_chunk_overlap = 50
 
     def load_from_env(self):
         import os
@@ -11,4 +18,11 @@ class settings:
         load_dotenv()
         self.openai_api_key = os.getenv("OPENAI_API_KEY", self.openai_api_key)
         self.openai_api_base = os.getenv("OPENAI_API_BASE", self.openai_api_base)
-        self.openai_model = os.getenv("OPENAI_MODEL", self.openai_model)
\ No newline at end of file
+        self.openai_model = os.getenv("OPENAI_MODEL", self.openai_model)
+        self.chunk_tokens = int(os.getenv("CHUNK_TOKENS", self.chunk_tokens))
+        self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", self.chunk_overlap))
+        self.max_workers = int(os.getenv("MAX_WORKERS", self.max_workers))
+        self.embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", self.embedding_model)
+        self.embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", self.embedding_batch_size))
+        self.index_chunk_tokens = int(os.getenv("INDEX_CHUNK_TOKENS", self.index_chunk_tokens))
+        self.index_chunk_overlap = int(os.getenv("INDEX_CHUNK_OVERLAP", self.index_chunk_overlap))
@@ -0,0 +1,107 @@
+"""Streaming transcript reader and incremental (rolling) summarization."""
+
+import sys
+import time
+
+from chunking import count_tokens
+
+
+def _open_source(source):
+    if source == "-":
+        return sys.stdin, False
+    return open(source, "r"), True
+
+
+def read_segments(source, segment_tokens=1000, follow=False, poll_interval=1.0,
+                  idle_timeout=None, model="gpt-4o-mini"):
+    """Yield new transcript text from a file (or "-" for stdin) as it arrives.
+
+    Lines are grouped into segments of roughly segment_tokens tokens. Pending
+    text is also flushed whenever the reader catches up with the writer, so a
+    segment is never held back waiting for more input. With follow=True the
+    file is tailed like `tail -f` until idle_timeout seconds pass without new
+    data (or forever when idle_timeout is None). Reading from stdin always
+    stops at end of input, since a closed pipe never receives more data.
+    """
+    stream, should_close = _open_source(source)
+    follow = follow and should_close
+    pending = []
+    pending_tokens = 0
+    partial_line = ""
+    last_data = time.monotonic()
+    try:
+        while True:
+            line = stream.readline()
+            if line:
+                last_data = time.monotonic()
+                # A writer may still be in the middle of this line
+                if not line.endswith("\n") and follow:
+                    partial_line += line
+                    continue
+                line = partial_line + line
+                partial_line = ""
+                pending.append(line)
+                pending_tokens += count_tokens(line, model)
+                if pending_tokens >= segment_tokens:
+                    yield "".join(pending)
+                    pending = []
+                    pending_tokens = 0
+                continue
+
+            # Caught up with the end of the input
+            if pending:
+                yield "".join(pending)
+                pending = []
+                pending_tokens = 0
+
+            idle = time.monotonic() - last_data
+            if not follow or (idle_timeout is not None and idle >= idle_timeout):
+                if partial_line:
+                    yield partial_line
+                return
+            time.sleep(poll_interval)
+    finally:
+        if should_close:
+            stream.close()
+
+
+class RollingSummary:
+    """Keep a meeting summary up to date as new transcript segments arrive.
+
+    Each update sends only the current summary and the new segment, so the
+    cost per update stays constant no matter how long the meeting runs.
+    """
+
+    def __init__(self, complete, max_tokens=500):
+        self.complete = complete
+        self.max_tokens = max_tokens
+        self.summary = ""
+        self.segments_processed = 0
+
+    def update(self, segment):
+        if not segment.strip():
+            return self.summary
+
+        if self.summary:
+            user_prompt = (
+                "Here is the summary of a meeting so far:\n\n"
+                f"{self.summary}\n\n"
+                "Update it with the following new part of the transcript. Keep "
+                "sections for key points, decisions, and action items (with owners "
+                "and deadlines), revise items that the new part changes, and do not "
+                f"drop earlier items:\n\n{segment}"
+            )
+        else:
+            user_prompt = f"Summarize the following meeting transcript with key points, decisions, and action items:\n\n{segment}"
+
+        self.summary = self.complete(user_prompt, max_tokens=self.max_tokens)
+        self.segments_processed += 1
+        return self.summary
+
+
+def stream_summaries(source, complete, segment_tokens=1000, follow=False,
+                     poll_interval=1.0, idle_timeout=None, model="gpt-4o-mini"):
+    """Yield the rolling summary after each new segment of the transcript"""
+    rolling = RollingSummary(complete)
+    for segment in read_segments(source, segment_tokens, follow, poll_interval, idle_timeout, model):
+        yield rolling.update(segment)
@@ -0,0 +1,294 @@
+"""Hierarchical retrieval index for answering questions over many transcripts.
+
+Transcripts are split into small chunks, embedded in batches and stored in
+an index directory:
+
+    vectors.f32     unit-length chunk embeddings (float32 rows, memory-mapped)
+    centroids.f32   one unit-length mean embedding per transcript
+    chunks.jsonl    chunk text and source, one JSON object per line
+    offsets.u64     byte offset of each line in chunks.jsonl
+    manifest.json   dimensions, counts and the chunk range of each transcript
+
+A question is answered in two levels: its embedding is first compared with
+the transcript centroids to pick the most relevant transcripts, then with
+the chunks of those transcripts only. The top k chunks are read from disk by
+offset and passed to the model, so the cost of answering depends on k and
+the number of transcripts shortlisted, not on the size of the archive.
+
+Usage:
+    python transcript_index.py index data/ recordings/*.txt
+    python transcript_index.py ask "What did we decide about the deploy date?"
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.metrics import metrics
+from chunking import chunk_transcript
+from main import _complete, get_client, get_config
+from results_store import content_hash
+from transcripts import find_transcripts
+
+
+class TranscriptIndex:
+    """On-disk chunk index with a transcript-level (centroid) first stage"""
+
+    def __init__(self, directory="transcript_index"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        else:
+            self.manifest = {"dimension": None, "model": None, "chunks": 0, "transcripts": []}
+        self._hashes = {entry["content_hash"] for entry in self.manifest["transcripts"]}
+        self._discard_partial_writes()
+
+    def _check_model(self, model):
+        # Vectors from different embedding models are not comparable, even
+        # when they have the same number of dimensions
+        if self.manifest["model"] is not None and self.manifest["model"] != model:
+            raise ValueError(
+                f"Index was built with embedding model {self.manifest['model']!r}, "
+                f"but OPENAI_EMBEDDING_MODEL is {model!r}; rebuild the index or change the setting"
+            )
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _discard_partial_writes(self):
+        # The manifest is written last, so anything past its counts is left
+        # over from an interrupted add() and is cut off
+        dimension = self.manifest["dimension"] or 0
+        sizes = {
+            "vectors.f32": self.manifest["chunks"] * dimension * 4,
+            "centroids.f32": len(self.manifest["transcripts"]) * dimension * 4,
+            "offsets.u64": self.manifest["chunks"] * 8,
+            "chunks.jsonl": self.manifest.get("chunks_bytes", 0),
+        }
+        for name, size in sizes.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as file:
+                    file.truncate(size)
+
+    def _save_manifest(self):
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file)
+        os.replace(temp_path, self.manifest_path)
+
+    def _matrix(self, name, rows):
+        if not rows:
+            return np.empty((0, self.manifest["dimension"] or 0), dtype=np.float32)
+        return np.memmap(self._path(name), dtype=np.float32, mode="r",
+                         shape=(rows, self.manifest["dimension"]))
+
+    # -- Indexing -----------------------------------------------------------
+
+    def embed(self, texts, batch_size=None):
+        """Embed texts in batches and return unit-length float32 rows"""
+        config = get_config()
+        batch_size = batch_size or config.embedding_batch_size
+        rows = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            with metrics.timer("embedding", batch=len(batch)):
+                response = get_client().embeddings.create(model=config.embedding_model, input=batch)
+            metrics.add_tokens(response.usage, operation="embedding")
+            rows.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        vectors = np.asarray(rows, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, source, transcript):
+        """Index one transcript; return the number of chunks added (0 if already indexed)"""
+        return self.add_many([(source, transcript)])[0][1]
+
+    def add_many(self, transcripts):
+        """Index (source, transcript) pairs; return (source, chunks added) for each.
+
+        Chunks of consecutive transcripts are embedded together, so an archive
+        of short transcripts shares embedding requests, and the manifest is
+        saved once at the end instead of once per transcript.
+        """
+        config = get_config()
+        self._check_model(config.embedding_model)
+        results = []
+        pending = []  # (result position, source, digest, chunks) not yet embedded
+        queued = set()
+        pending_chunks = 0
+        try:
+            for source, transcript in transcripts:
+                digest = content_hash(transcript)
+                results.append((source, 0))
+                if digest in self._hashes or digest in queued:
+                    continue
+                chunks = chunk_transcript(
+                    transcript,
+                    max_tokens=config.index_chunk_tokens,
+                    overlap_tokens=config.index_chunk_overlap,
+                    model=config.openai_model,
+                )
+                if not chunks:
+                    continue
+                pending.append((len(results) - 1, source, digest, chunks))
+                queued.add(digest)
+                pending_chunks += len(chunks)
+                if pending_chunks >= config.embedding_batch_size:
+                    self._append(pending, results)
+                    pending, queued, pending_chunks = [], set(), 0
+            if pending:
+                self._append(pending, results)
+        finally:
+            # Whatever was appended before an error is kept
+            self._save_manifest()
+        return results
+
+    def _append(self, pending, results):
+        vectors = self.embed([chunk for *_, chunks in pending for chunk in chunks])
+        if self.manifest["dimension"] is None:
+            self.manifest["dimension"] = int(vectors.shape[1])
+            self.manifest["model"] = get_config().embedding_model
+        elif vectors.shape[1] != self.manifest["dimension"]:
+            raise ValueError("Embedding dimension does not match the existing index")
+
+        # Append data files first and the manifest last, so a crash in
+        # between leaves the index as it was before this run
+        offsets = []
+        centroids = []
+        with open(self._path("chunks.jsonl"), "ab") as file:
+            offset = file.tell()
+            for _, source, _, chunks in pending:
+                for number, chunk in enumerate(chunks):
+                    line = (json.dumps({"source": source, "chunk": number, "text": chunk}) + "\n").encode("utf-8")
+                    offsets.append(offset)
+                    file.write(line)
+                    offset += len(line)
+        start = 0
+        for _, _, _, chunks in pending:
+            centroid = vectors[start:start + len(chunks)].mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+            start += len(chunks)
+        with open(self._path("offsets.u64"), "ab") as file:
+            file.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+        with open(self._path("vectors.f32"), "ab") as file:
+            file.write(vectors.astype(np.float32).tobytes())
+        with open(self._path("centroids.f32"), "ab") as file:
+            file.write(np.asarray(centroids, dtype=np.float32).tobytes())
+
+        for position, source, digest, chunks in pending:
+            self.manifest["transcripts"].append({
+                "source": source,
+                "content_hash": digest,
+                "start": self.manifest["chunks"],
+                "count": len(chunks),
+            })
+            self.manifest["chunks"] += len(chunks)
+            self._hashes.add(digest)
+            results[position] = (source, len(chunks))
+        self.manifest["chunks_bytes"] = offset
+
+    # -- Querying -----------------------------------------------------------
+
+    def _read_chunks(self, rows):
+        offsets = np.memmap(self._path("offsets.u64"), dtype=np.uint64, mode="r",
+                            shape=(self.manifest["chunks"],))
+        chunks = []
+        with open(self._path("chunks.jsonl"), "rb") as file:
+            for row in rows:
+                file.seek(int(offsets[row]))
+                chunks.append(json.loads(file.readline()))
+        return chunks
+
+    def search(self, question, k=5, transcripts=8):
+        """Return the k chunks most similar to the question, best first.
+
+        Only the chunks of the `transcripts` transcripts whose centroids are
+        closest to the question are scored.
+        """
+        entries = self.manifest["transcripts"]
+        if not entries:
+            return []
+        self._check_model(get_config().embedding_model)
+        with metrics.timer("retrieval", k=k):
+            query = self.embed([question])[0]
+
+            # Level 1: shortlist transcripts by centroid similarity
+            centroid_scores = self._matrix("centroids.f32", len(entries)) @ query
+            shortlist = min(transcripts, len(entries))
+            top_transcripts = np.argpartition(-centroid_scores, shortlist - 1)[:shortlist]
+
+            # Level 2: score only the chunks of the shortlisted transcripts
+            vectors = self._matrix("vectors.f32", self.manifest["chunks"])
+            rows = np.concatenate([
+                np.arange(entries[i]["start"], entries[i]["start"] + entries[i]["count"])
+                for i in top_transcripts
+            ])
+            scores = vectors[rows] @ query
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+
+            chunks = self._read_chunks(rows[best])
+        for chunk, score in zip(chunks, scores[best]):
+            chunk["score"] = float(score)
+        return chunks
+
+    def answer(self, question, k=5, transcripts=8):
+        """Answer a question from the top k retrieved chunks only"""
+        chunks = self.search(question, k, transcripts)
+        if not chunks:
+            return "The index is empty; index some transcripts first."
+        context = "\n\n".join(
+            f"[{chunk['source']}, part {chunk['chunk'] + 1}]\n{chunk['text']}" for chunk in chunks
+        )
+        user_prompt = (
+            "Answer the question using only the following excerpts from meeting "
+            "transcripts. Cite the transcript for each fact, and say so if the "
+            f"excerpts do not contain the answer.\n\nExcerpts:\n{context}\n\n"
+            f"Question: {question}"
+        )
+        return _complete(user_prompt, max_tokens=500)
+
+
+def read_files(paths):
+    for path in paths:
+        with open(path, "r") as file:
+            yield path, file.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index transcripts and answer questions from them.")
+    parser.add_argument("--index-dir", default="transcript_index", help="Directory holding the index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Add transcripts to the index")
+    index_parser.add_argument("inputs", nargs="+", help="Transcript files, directories or glob patterns")
+    index_parser.add_argument("--pattern", default="*.txt", help="File pattern used inside directories")
+
+    ask_parser = commands.add_parser("ask", help="Answer a question from the indexed transcripts")
+    ask_parser.add_argument("question")
+    ask_parser.add_argument("-k", type=int, default=5, help="Number of chunks to retrieve")
+    ask_parser.add_argument("--transcripts", type=int, default=8,
+                            help="Number of transcripts shortlisted before chunk scoring")
+    args = parser.parse_args()
+
+    index = TranscriptIndex(args.index_dir)
+    if args.command == "index":
+        for path, added in index.add_many(read_files(find_transcripts(args.inputs, args.pattern))):
+            print(f"{path}: {added} chunks indexed" if added else f"{path}: already indexed")
+        print(f"Index holds {index.manifest['chunks']} chunks from {len(index.manifest['transcripts'])} transcripts.")
+    else:
+        print(index.answer(args.question, args.k, args.transcripts))
+    print(f"Timings:\n{metrics.report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Finding transcript files on disk, shared by the batch and index CLIs."""
+
+import glob
+import os
+
+
+def find_transcripts(inputs, pattern="*.txt"):
+    """Expand directories and glob patterns into a sorted list of files"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(glob.glob(os.path.join(item, "**", pattern), recursive=True))
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            paths.update(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+    return sorted(paths)
@@ -0,0 +1,157 @@
+"""Persistent exact + semantic cache for generated work instructions.
+
+Lookups first try an exact match on a hash of the normalized task text. If
+that misses, the task is embedded and compared against every cached task
+embedding; the closest one is reused if its cosine similarity is at least
+the configured threshold.
+
+Entries are keyed by the chat model and prompt preamble that generated them,
+and by the embedding model of their vector, so changing any of these never
+serves an instruction or compares a vector made under other settings.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+def normalize_task(text):
+    """Normalize wording differences that do not change the task"""
+    text = text.lower().strip()
+    text = re.sub(r"\s+", " ", text)
+    return text.rstrip(" .;:")
+
+
+def task_hash(text):
+    return hashlib.sha256(normalize_task(text).encode("utf-8")).hexdigest()
+
+
+class InstructionCache:
+    """SQLite-backed instruction cache with an in-memory vector index"""
+
+    def __init__(self, embed, path="instruction_cache.db", threshold=0.92,
+                 model="", embedding_model="", prompt=""):
+        self.embed = embed
+        self.path = path
+        self.threshold = threshold
+        self.model = model
+        self.embedding_model = embedding_model
+        self.prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS instructions (
+                id INTEGER PRIMARY KEY,
+                text_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                embedding_model TEXT NOT NULL,
+                task TEXT NOT NULL,
+                instruction TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE (text_hash, model, prompt_hash, embedding_model)
+            )
+            """
+        )
+        self._connection.commit()
+        self._load_index()
+
+    def _migrate(self):
+        # Caches created before entries were keyed by model and prompt do not
+        # record what generated them, so they cannot be reused safely
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(instructions)")]
+        if columns and "model" not in columns:
+            self._connection.execute("DROP TABLE instructions")
+
+    def _load_index(self):
+        # Vector index: unit-length embeddings stacked in a growable matrix,
+        # holding only entries made with the current settings
+        rows = self._connection.execute(
+            "SELECT id, embedding FROM instructions "
+            "WHERE model = ? AND prompt_hash = ? AND embedding_model = ? ORDER BY id",
+            (self.model, self.prompt_hash, self.embedding_model),
+        ).fetchall()
+        self._ids = [row_id for row_id, _ in rows]
+        self._size = len(rows)
+        if rows:
+            dimension = len(np.frombuffer(rows[0][1], dtype=np.float32))
+            self._matrix = np.empty((max(self._size, 64), dimension), dtype=np.float32)
+            for i, (_, blob) in enumerate(rows):
+                self._matrix[i] = np.frombuffer(blob, dtype=np.float32)
+        else:
+            self._matrix = None
+
+    def _append_to_index(self, row_id, vector):
+        if self._matrix is None:
+            self._matrix = np.empty((64, len(vector)), dtype=np.float32)
+        elif self._size == len(self._matrix):
+            grown = np.empty((len(self._matrix) * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size] = vector
+        self._ids.append(row_id)
+        self._size += 1
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, task):
+        """Return (instruction, match, similarity, embedding) for a task.
+
+        instruction is None on a miss; the embedding computed for the
+        semantic lookup is returned so put() does not embed the task again.
+        """
+        digest = task_hash(task)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT instruction FROM instructions WHERE text_hash = ? AND model = ? AND prompt_hash = ?",
+                (digest, self.model, self.prompt_hash),
+            ).fetchone()
+        if row is not None:
+            return row[0], "exact", 1.0, None
+
+        vector = self._unit(self.embed(task))
+        with self._lock:
+            if not self._size:
+                return None, None, 0.0, vector
+            similarities = self._matrix[:self._size] @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            best_id = self._ids[best]
+        if similarity < self.threshold:
+            return None, None, similarity, vector
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT instruction FROM instructions WHERE id = ?", (best_id,)
+            ).fetchone()
+        return row[0], "semantic", similarity, vector
+
+    def put(self, task, instruction, embedding=None):
+        vector = self._unit(embedding if embedding is not None else self.embed(task))
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO instructions (text_hash, model, prompt_hash, embedding_model, "
+                "task, instruction, embedding, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_hash(task), self.model, self.prompt_hash, self.embedding_model,
+                 task, instruction, vector.tobytes(), time.time()),
+            )
+            self._connection.commit()
+            if cursor.rowcount:
+                self._append_to_index(cursor.lastrowid, vector)
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        self._connection.close()
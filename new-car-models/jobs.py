@@ -0,0 +1,27 @@
+"""Queue work instruction generation as background jobs.
+
+Usage:
+    python jobs.py submit-samples          # one job per task in main.py
+    python jobs.py submit generate_instruction '{"task": "Torque the wheel nuts", "safety_critical": true}' --priority 10
+    python jobs.py work --workers 8 --until-empty
+    python jobs.py result 1
+"""
+
+import _shared_path  # noqa: F401  (puts the repository root on sys.path)
+from shared.jobqueue import run_cli
+from main import generate_instruction, safety_critical_tasks, task_descriptions
+
+
+def instruction_job(job):
+    return generate_instruction(job.payload["task"], job.payload.get("safety_critical", False))
+
+
+HANDLERS = {"generate_instruction": instruction_job}
+SAMPLES = {
+    "generate_instruction": [
+        {"task": task, "safety_critical": task in safety_critical_tasks} for task in task_descriptions
+    ]
+}
+
+if __name__ == "__main__":
+    run_cli(HANDLERS, samples=SAMPLES)
@@ -1,4 +1,6 @@
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from settings import settings
 
 # Step 1: Mock Input Data
@@ -10,45 +12,194 @@ task_descriptions = [
     "Program the infotainment ECU with the latest software package and validate connectivity with dashboard display."
 ]
 
-# Step 2: Initialize Settings
-config = settings()
-config.load_from_env()
+# Tasks whose instructions are always generated fresh, never served from cache
+safety_critical_tasks = {
+    task_descriptions[0],  # high-voltage battery installation
+    task_descriptions[1],  # ADAS sensor calibration
+}
 
-# Step 3: Initialize OpenAI Client
-client = OpenAI(
-    api_key=config.openai_api_key,
-)
+# Step 2: Initialize Settings (on first use, then reused)
+@lru_cache(maxsize=None)
+def get_config():
+    config = settings()
+    config.load_from_env()
+    return config
 
-def generate_instruction(task_description):
-    user_prompt = f"""
-    You are an expert automotive manufacturing supervisor. Generate step-by-step
-    work instructions for the following new model task. Include safety
-    precautions, required tools (if any), and acceptance checks. Write in clear,
-    numbered steps suitable for production workers.
+# Step 3: Initialize OpenAI Client (on first use, then reused)
+@lru_cache(maxsize=None)
+def get_client():
+    # Imported here so importing this module stays cheap
+    from openai import OpenAI
 
-    Task: {task_description}
+    return OpenAI(
+        api_key=get_config().openai_api_key,
+    )
+
+@lru_cache(maxsize=None)
+def get_cache():
+    """Return the shared instruction cache, or None if it is disabled"""
+    config = get_config()
+    if not config.cache_enabled:
+        return None
+    # Imported here so importing this module stays cheap
+    from instruction_cache import InstructionCache
+
+    return InstructionCache(
+        embed=embed_text,
+        path=config.cache_path,
+        threshold=config.cache_threshold,
+        model=config.openai_model,
+        embedding_model=config.embedding_model,
+        prompt=INSTRUCTION_PREAMBLE,
+    )
+
+def embed_text(text):
+    response = get_client().embeddings.create(
+        model=get_config().embedding_model,
+        input=text,
+    )
+    return response.data[0].embedding
 
-    Work Instructions:
+# Static prompt prefix: kept byte-identical across requests and sent first so
+# the provider can reuse its cached prefix; only the task text varies
+INSTRUCTION_PREAMBLE = """You are an expert automotive technician and manufacturing supervisor.
+Provide detailed assembly instructions. Generate step-by-step
+work instructions for the new model task given by the user. Include safety
+precautions, required tools (if any), and acceptance checks. Write in clear,
+numbered steps suitable for production workers."""
+
+# Providers only cache prompt prefixes of at least this many tokens (OpenAI: 1024)
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+def prefix_is_cacheable():
+    # About 4 characters per token for English text
+    return len(INSTRUCTION_PREAMBLE) // 4 >= PROMPT_CACHE_MIN_TOKENS
+
+def _request_instruction(task_description, safety_critical=False):
+    """Generate instructions for one task and return them with request stats.
+
+    Instructions for an identical (after normalization) or sufficiently
+    similar task are served from the cache unless the task is safety-critical.
     """
+    started = time.perf_counter()
+    cache = None if safety_critical else get_cache()
+    embedding = None
+    if cache is not None:
+        instruction, match, similarity, embedding = cache.lookup(task_description)
+        if instruction is not None:
+            return instruction, {
+                "latency": time.perf_counter() - started,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "completion_tokens": 0,
+                "cache": f"{match} ({similarity:.3f})",
+            }
+
     # Call OpenAI API to generate instructions
     # Using the specified model and settings
-    response = client.chat.completions.create(
-        model=config.openai_model,
+    response = get_client().chat.completions.create(
+        model=get_config().openai_model,
         messages=[
             {
                 "role": "system",
-                "content": "You are an expert automotive technician. Provide detailed assembly instructions."
+                "content": INSTRUCTION_PREAMBLE
             },
             {
                 "role": "user",
-                "content": user_prompt
+                "content": f"Task: {task_description}\n\nWork Instructions:"
             }
         ],
         temperature=0.7,
     )
-    return response.choices[0].message.content
+    usage = response.usage
+    details = getattr(usage, "prompt_tokens_details", None)
+    stats = {
+        "latency": time.perf_counter() - started,
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+        "cache": "bypass" if safety_critical else ("miss" if cache is not None else "off"),
+    }
+    instruction = response.choices[0].message.content
+    if cache is not None:
+        cache.put(task_description, instruction, embedding)
+    return instruction, stats
+
+def _request_instruction_or_error(task_description, safety_critical=False):
+    # Used for many tasks at once: a failed request is recorded in that
+    # task's stats instead of discarding the other results
+    started = time.perf_counter()
+    try:
+        return _request_instruction(task_description, safety_critical)
+    except Exception as e:
+        return None, {
+            "latency": time.perf_counter() - started,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "cache": "error",
+            "error": str(e) or type(e).__name__,
+        }
+
+def generate_instruction(task_description, safety_critical=False):
+    instruction, _ = _request_instruction(task_description, safety_critical)
+    return instruction
+
+def generate_instructions(tasks, max_workers=None, warm_cache=None, safety_critical=()):
+    """Generate instructions for many tasks concurrently, in input order.
+
+    Returns a list of (task, instruction, stats) tuples. With warm_cache the
+    first task is sent on its own so the shared prefix is cached before the
+    remaining requests fan out over the worker pool. By default this only
+    happens when the preamble is long enough for the provider to cache it;
+    otherwise it would just add one request of latency. Tasks listed in
+    safety_critical bypass the instruction cache. A task whose request fails
+    gets None as its instruction and the error in stats["error"]; the other
+    tasks are unaffected.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return []
+    max_workers = max_workers or get_config().max_workers
+    flags = [task in safety_critical for task in tasks]
+    if warm_cache is None:
+        warm_cache = prefix_is_cacheable()
+
+    results = []
+    remaining, remaining_flags = tasks, flags
+    if warm_cache:
+        results.append((tasks[0], *_request_instruction_or_error(tasks[0], flags[0])))
+        remaining, remaining_flags = tasks[1:], flags[1:]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = executor.map(_request_instruction_or_error, remaining, remaining_flags)
+        for task, (instruction, stats) in zip(remaining, responses):
+            results.append((task, instruction, stats))
+    return results
+
+def main():
+    # Step 4: Generate and Print Instructions
+    started = time.perf_counter()
+    results = generate_instructions(task_descriptions, safety_critical=safety_critical_tasks)
+    elapsed = time.perf_counter() - started
+
+    for task, instruction, stats in results:
+        if instruction is None:
+            print(f"Task: {task}\nFailed to generate instructions: {stats['error']}\n")
+            continue
+        print(f"Task: {task}\nWork Instructions:\n{instruction}\n")
+        print(
+            f"[cache {stats['cache']}, latency {stats['latency']:.2f}s, prompt tokens {stats['prompt_tokens']}, "
+            f"cached tokens {stats['cached_tokens']}, completion tokens {stats['completion_tokens']}]\n"
+        )
+
+    total_prompt = sum(stats["prompt_tokens"] for _, _, stats in results)
+    total_cached = sum(stats["cached_tokens"] for _, _, stats in results)
+    generated = sum(1 for _, instruction, _ in results if instruction is not None)
+    print(
+        f"Generated {generated}/{len(results)} instructions in {elapsed:.2f}s "
+        f"({total_cached}/{total_prompt} prompt tokens served from the provider's prompt cache)"
+    )
 
-# Step 4: Generate and Print Instructions
-for task in task_descriptions:
-    instruction = generate_instruction(task)
-    print(f"Task: {task}\nWork Instructions:\n{instruction}\n")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,11 @@ class settings:
         self.openai_api_key = "your_openai_api_key_here"
         self.openai_api_base = "https://api.openai.com/v1"
         self.openai_model = "gpt-4o-mini"
+        self.max_workers = 8
+        self.embedding_model = "text-embedding-3-small"
+        self.cache_enabled = True
+        self.cache_path = "instruction_cache.db"
+        self.cache_threshold = 0.92
 
     def load_from_env(self):
         import os
@@ -11,4 +16,9 @@ class settings:
         load_dotenv()
         self.openai_api_key = os.getenv("OPENAI_API_KEY", self.openai_api_key)
         self.openai_api_base = os.getenv("OPENAI_API_BASE", self.openai_api_base)
-        self.openai_model = os.getenv("OPENAI_MODEL", self.openai_model)
\ No newline at end of file
+        self.openai_model = os.getenv("OPENAI_MODEL", self.openai_model)
+        self.max_workers = int(os.getenv("MAX_WORKERS", self.max_workers))
+        self.embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", self.embedding_model)
+        self.cache_enabled = os.getenv("INSTRUCTION_CACHE", "1") not in ("0", "false", "False")
+        self.cache_path = os.getenv("INSTRUCTION_CACHE_PATH", self.cache_path)
+        self.cache_threshold = float(os.getenv("INSTRUCTION_CACHE_THRESHOLD", self.cache_threshold))
\ No newline at end of file
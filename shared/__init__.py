@@ -0,0 +1 @@
+"""Helpers shared by the projects in this repository."""
@@ -0,0 +1,62 @@
+"""Measure how long it takes to import a project's main.py and build its client.
+
+Each sample runs in a fresh interpreter, started in the project directory,
+so nothing is already imported.
+
+Usage:
+    python shared/bench_startup.py meeting-summarizer [--runs 10]
+    python ../shared/bench_startup.py . --module main --client get_client
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def import_snippet(module):
+    return f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def client_snippet(module, client):
+    return (
+        f"import time; import {module}; t = time.perf_counter(); "
+        f"{module}.{client}(); first = time.perf_counter() - t; t = time.perf_counter(); "
+        f"{module}.{client}(); print(first, time.perf_counter() - t)"
+    )
+
+
+def run_snippet(snippet, project_dir):
+    output = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=project_dir, check=True, capture_output=True, text=True
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def report(label, samples):
+    samples_ms = [sample * 1000 for sample in samples]
+    print(
+        f"{label:<28} median {statistics.median(samples_ms):8.2f} ms   "
+        f"min {min(samples_ms):8.2f} ms   max {max(samples_ms):8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark for a project's main module")
+    parser.add_argument("project_dir", help="Project directory containing the module")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--client", default="get_client", help="Cached client factory in the module")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    snippet = import_snippet(args.module)
+    report(f"import {args.module}", [run_snippet(snippet, args.project_dir)[0] for _ in range(args.runs)])
+
+    snippet = client_snippet(args.module, args.client)
+    client_runs = [run_snippet(snippet, args.project_dir) for _ in range(args.runs)]
+    report(f"first {args.client}()", [first for first, _ in client_runs])
+    report(f"cached {args.client}()", [cached for _, cached in client_runs])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""SQLite-backed job queue with a worker pool, retries and checkpoints.
+
+Long-running LLM workloads are submitted as jobs instead of being run
+inline, so a crash or restart never loses work that was already paid for:
+
+- Jobs are stored in a SQLite database and claimed by workers in priority
+  order (higher first), then submission order.
+- A claimed job holds a lease. If its worker dies, the lease expires and
+  another worker picks the job up again.
+- Failed jobs are retried with exponential backoff up to max_attempts.
+- An idempotency key makes resubmitting the same work a no-op that returns
+  the existing job; resubmitting a job that failed queues it again.
+- Handlers can save checkpoints while they run (for example finished
+  sub-steps); a retried job sees its last checkpoint. Results are stored
+  when a job completes.
+
+Each project registers its handlers and calls run_cli() from its jobs.py:
+
+    python jobs.py submit summarize_meeting '{"path": "data/meeting_transcript.txt"}'
+    python jobs.py submit-samples
+    python jobs.py work --workers 4 --until-empty
+    python jobs.py status
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    idempotency_key TEXT UNIQUE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    checkpoint TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, id);
+"""
+
+
+def payload_key(kind, payload):
+    """Default idempotency key: a hash of the job kind and its canonical payload"""
+    canonical = json.dumps([kind, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LeaseLost(Exception):
+    """The worker no longer holds the job's lease; another worker may be running it"""
+
+
+class Job:
+    """A claimed job as seen by its handler"""
+
+    def __init__(self, queue, row):
+        self.queue = queue
+        self.worker_id = row["lease_owner"]
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.payload = json.loads(row["payload"])
+        self.attempts = row["attempts"]
+        self.checkpoint = json.loads(row["checkpoint"]) if row["checkpoint"] else None
+
+    def save_checkpoint(self, data):
+        """Persist partial progress and extend the lease; raise LeaseLost if it expired"""
+        self.checkpoint = data
+        self.queue.save_checkpoint(self.id, data, self.worker_id)
+
+
+class JobQueue:
+    """Persistent priority job queue; safe to share between threads and processes"""
+
+    def __init__(self, path="jobs.db", lease_seconds=600, retry_delay=5.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections are not thread-safe
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    # -- Producer side ------------------------------------------------------
+
+    def submit(self, kind, payload, priority=0, idempotency_key=None, max_attempts=3):
+        """Queue a job and return its id; with a known idempotency_key, return the existing id.
+
+        A failed job with the same key is queued again with fresh attempts,
+        keeping its checkpoint, so work that failed during an outage can be
+        resubmitted.
+        """
+        now = time.time()
+        connection = self._connect()
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO jobs (kind, payload, priority, idempotency_key, max_attempts, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload), priority, idempotency_key, max_attempts, now, now),
+        )
+        if cursor.rowcount:
+            return cursor.lastrowid
+        connection.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, max_attempts = ?, priority = ?, run_after = 0, "
+            "lease_owner = NULL, lease_until = NULL, error = NULL, updated_at = ? "
+            "WHERE idempotency_key = ? AND status = 'failed'",
+            (max_attempts, priority, now, idempotency_key),
+        )
+        return connection.execute(
+            "SELECT id FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()["id"]
+
+    def retry(self, job_id):
+        """Queue a failed job again with fresh attempts; return False if it is not failed"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, run_after = 0, lease_owner = NULL, "
+            "lease_until = NULL, error = NULL, updated_at = ? WHERE id = ? AND status = 'failed'",
+            (time.time(), job_id),
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ("payload", "checkpoint", "result"):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def result(self, job_id):
+        job = self.get(job_id)
+        return job["result"] if job and job["status"] == "done" else None
+
+    def stats(self):
+        rows = self._connect().execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+        return {row["status"]: row["count"] for row in rows}
+
+    def list(self, status=None, limit=50):
+        query = "SELECT id, kind, status, priority, attempts, error, updated_at FROM jobs"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        return [dict(row) for row in self._connect().execute(query, params + (limit,))]
+
+    # -- Worker side --------------------------------------------------------
+
+    def claim(self, worker_id, kinds=None):
+        """Atomically claim the next runnable job, or return None"""
+        now = time.time()
+        connection = self._connect()
+        kind_filter = ""
+        params = [now, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                # Runnable: pending and due, or running with an expired lease
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE ((status = 'pending' AND run_after <= ?) "
+                    "OR (status = 'running' AND lease_until < ?))" + kind_filter +
+                    " ORDER BY priority DESC, id LIMIT 1",
+                    params,
+                ).fetchone()
+                if row is None:
+                    connection.execute("COMMIT")
+                    return None
+                if row["status"] == "running" and row["attempts"] >= row["max_attempts"]:
+                    # Every attempt lost its worker (for example a job that crashes the
+                    # process), so give up instead of handing it out forever
+                    connection.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, "
+                        "lease_until = NULL, updated_at = ? WHERE id = ?",
+                        (f"Lease expired on attempt {row['attempts']} of {row['max_attempts']}", now, row["id"]),
+                    )
+                    continue
+                break
+            connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row["id"]),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        row = dict(row)
+        row["attempts"] += 1
+        row["lease_owner"] = worker_id
+        return Job(self, row)
+
+    # Updates from a worker only apply while it still holds the lease, so a
+    # worker that outlived its lease cannot overwrite the new owner's outcome
+
+    def save_checkpoint(self, job_id, data, worker_id):
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET checkpoint = ?, lease_until = ?, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (json.dumps(data), now + self.lease_seconds, now, job_id, worker_id),
+        )
+        if not cursor.rowcount:
+            raise LeaseLost(f"Job {job_id} is no longer leased to {worker_id}")
+
+    def complete(self, job_id, result, worker_id):
+        """Store the result; return False if the lease was lost"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL, "
+            "lease_until = NULL, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (json.dumps(result), time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id, error, worker_id):
+        """Record a failure and retry with backoff unless attempts are used up;
+        return False if the lease was lost"""
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END, "
+            "error = ?, run_after = ? + ? * (1 << (attempts - 1)), lease_owner = NULL, lease_until = NULL, "
+            "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (error, now, self.retry_delay, now, job_id, worker_id),
+        )
+        return cursor.rowcount > 0
+
+    def has_unfinished(self, kinds=None):
+        query = "SELECT 1 FROM jobs WHERE status IN ('pending', 'running')"
+        params = ()
+        if kinds:
+            query += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params = tuple(kinds)
+        return self._connect().execute(query + " LIMIT 1", params).fetchone() is not None
+
+
+def run_workers(queue, handlers, workers=4, until_empty=False, poll_interval=1.0):
+    """Run jobs with a pool of worker threads.
+
+    handlers maps a job kind to a function taking a Job and returning a
+    JSON-serializable result. With until_empty the pool stops once no
+    pending or running jobs of those kinds remain.
+    """
+    kinds = sorted(handlers)
+    stop = threading.Event()
+    host = f"{socket.gethostname()}:{os.getpid()}"
+
+    def work(number):
+        worker_id = f"{host}:{number}"
+        while not stop.is_set():
+            job = queue.claim(worker_id, kinds)
+            if job is None:
+                if until_empty and not queue.has_unfinished(kinds):
+                    return
+                stop.wait(poll_interval)
+                continue
+            started = time.perf_counter()
+            try:
+                result = handlers[job.kind](job)
+            except LeaseLost:
+                print(f"[{worker_id}] job {job.id} ({job.kind}) lost its lease; stopped")
+            except Exception:
+                if queue.fail(job.id, traceback.format_exc(), worker_id):
+                    print(f"[{worker_id}] job {job.id} ({job.kind}) failed on attempt {job.attempts}")
+                else:
+                    print(f"[{worker_id}] job {job.id} ({job.kind}) failed after losing its lease; outcome discarded")
+            else:
+                if queue.complete(job.id, result, worker_id):
+                    print(f"[{worker_id}] job {job.id} ({job.kind}) done in {time.perf_counter() - started:.1f}s")
+                else:
+                    print(f"[{worker_id}] job {job.id} ({job.kind}) finished after losing its lease; result discarded")
+
+    threads = [threading.Thread(target=work, args=(number,), daemon=True) for number in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        # Running jobs keep their lease and are picked up again after it expires
+        stop.set()
+        print("Stopping workers...")
+
+
+def run_cli(handlers, default_db="jobs.db", idempotency_key=payload_key, samples=None):
+    """Command line for a project's jobs.py: submit, submit-samples, work, status, result and retry.
+
+    idempotency_key is called as idempotency_key(kind, payload) to derive a
+    key when none is passed on the command line, so submitting the same
+    work twice returns the existing job. samples maps a job kind to a list
+    of payloads queued by submit-samples.
+    """
+    parser = argparse.ArgumentParser(description="Submit and run queued jobs.")
+    parser.add_argument("--db", default=os.getenv("JOBS_DB", default_db), help="SQLite job database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Queue a job")
+    submit_parser.add_argument("kind", choices=sorted(handlers))
+    submit_parser.add_argument("payload", nargs="?", default="{}", help="JSON payload")
+    submit_parser.add_argument("--key", help="Idempotency key (derived from the payload by default)")
+
+    samples_parser = commands.add_parser("submit-samples", help="Queue the project's sample workload")
+
+    for command_parser in (submit_parser, samples_parser):
+        command_parser.add_argument("--priority", type=int, default=0, help="Higher runs first")
+        command_parser.add_argument("--max-attempts", type=int, default=3)
+
+    work_parser = commands.add_parser("work", help="Run queued jobs")
+    work_parser.add_argument("--workers", type=int, default=4)
+    work_parser.add_argument("--until-empty", action="store_true", help="Exit when no jobs remain")
+
+    status_parser = commands.add_parser("status", help="Show queue counts and recent jobs")
+    status_parser.add_argument("--state", help="Only list jobs in this state")
+
+    result_parser = commands.add_parser("result", help="Print a job's stored result")
+    result_parser.add_argument("job_id", type=int)
+
+    retry_parser = commands.add_parser("retry", help="Queue a failed job again")
+    retry_parser.add_argument("job_id", type=int)
+    args = parser.parse_args()
+
+    queue = JobQueue(args.db)
+
+    def report_submitted(job_id, kind):
+        # An existing job may be running or done already; say which
+        status = queue.get(job_id)["status"]
+        state = "queued" if status == "pending" else f"already {status}"
+        print(f"Job {job_id} {state} ({kind})")
+
+    if args.command == "submit":
+        payload = json.loads(args.payload)
+        key = args.key or idempotency_key(args.kind, payload)
+        report_submitted(queue.submit(args.kind, payload, args.priority, key, args.max_attempts), args.kind)
+    elif args.command == "submit-samples":
+        for kind, payloads in (samples or {}).items():
+            for payload in payloads:
+                job_id = queue.submit(kind, payload, args.priority, idempotency_key(kind, payload), args.max_attempts)
+                report_submitted(job_id, kind)
+    elif args.command == "retry":
+        if queue.retry(args.job_id):
+            print(f"Job {args.job_id} queued again")
+        else:
+            job = queue.get(args.job_id)
+            print(f"Job {args.job_id} not found" if job is None else f"Job {args.job_id} is {job['status']}, not failed")
+    elif args.command == "work":
+        run_workers(queue, handlers, args.workers, args.until_empty)
+    elif args.command == "status":
+        print(json.dumps(queue.stats()))
+        for job in queue.list(args.state):
+            print(f"{job['id']:>6}  {job['kind']:<24}{job['status']:<10}priority {job['priority']:<4}attempts {job['attempts']}")
+    else:
+        job = queue.get(args.job_id)
+        if job is None:
+            print(f"Job {args.job_id} not found")
+        elif job["status"] != "done":
+            print(f"Job {args.job_id} is {job['status']}" + (f":\n{job['error']}" if job["error"] else ""))
+        else:
+            result = job["result"]
+            print(result if isinstance(result, str) else json.dumps(result, indent=2))
@@ -0,0 +1,300 @@
+"""Lightweight timing, counter and profiling instrumentation.
+
+Usage:
+    from shared.metrics import metrics
+
+    with metrics.timer("embedding"):
+        response = client.embeddings.create(...)
+    metrics.add_tokens(response.usage, operation="embedding")
+
+    @metrics.timed("llm_call")
+    def ask(prompt): ...
+
+    print(metrics.report())          # human readable table
+    metrics.export("metrics.prom")   # Prometheus text format (or .json)
+
+Set METRICS_FILE to export a snapshot automatically when the process
+exits. Set METRICS_PROFILE=cprofile or METRICS_PROFILE=sample to profile
+the blocks wrapped in metrics.profile(); nothing is profiled otherwise.
+"""
+
+import atexit
+import cProfile
+import collections
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the Prometheus histogram buckets for timers
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    rendered = []
+    for key, value in pairs:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        rendered.append(f'{key}="{value}"')
+    return "{" + ",".join(rendered) + "}"
+
+
+class _Timer:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Metrics:
+    """Thread-safe registry of counters and timers"""
+
+    def __init__(self, namespace="app"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters = collections.defaultdict(float)
+        self._timers = collections.defaultdict(_Timer)
+
+    # -- Recording ----------------------------------------------------------
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter"""
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration for a timer"""
+        with self._lock:
+            self._timers[(name, _label_key(labels))].observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block; failures are timed too and counted in <name>_errors"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name=None, **labels):
+        """Decorator form of timer(); the name defaults to the function name"""
+        def decorator(function):
+            timer_name = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(timer_name, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_tokens(self, usage, **labels):
+        """Count prompt/completion tokens from an API usage object or dict"""
+        if usage is None:
+            return
+        if not isinstance(usage, dict):
+            usage = {
+                key: getattr(usage, key, None)
+                for key in ("prompt_tokens", "completion_tokens", "input_tokens", "output_tokens")
+            }
+        prompt = usage.get("prompt_tokens") or usage.get("input_tokens") or 0
+        completion = usage.get("completion_tokens") or usage.get("output_tokens") or 0
+        if prompt:
+            self.inc("tokens", prompt, kind="prompt", **labels)
+        if completion:
+            self.inc("tokens", completion, kind="completion", **labels)
+
+    def add_bytes(self, name, count, **labels):
+        """Count bytes transferred or processed"""
+        self.inc(f"{name}_bytes", count, **labels)
+
+    # -- Export -------------------------------------------------------------
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dict"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            timers = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": timer.count,
+                    "total_seconds": timer.total,
+                    "mean_seconds": timer.total / timer.count if timer.count else 0.0,
+                    "min_seconds": timer.min if timer.count else 0.0,
+                    "max_seconds": timer.max,
+                }
+                for (name, labels), timer in sorted(self._timers.items())
+            ]
+        return {"namespace": self.namespace, "timestamp": time.time(), "counters": counters, "timers": timers}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted(self._timers.items())
+
+            seen = set()
+            for (name, labels), value in counters:
+                metric = f"{self.namespace}_{name}_total"
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+
+            for (name, labels), timer in timers:
+                metric = f"{self.namespace}_{name}_seconds"
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS, timer.buckets):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_format_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {timer.count}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {timer.total:.6f}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {timer.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write a snapshot to path: Prometheus text for .prom/.txt, else JSON"""
+        content = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def report(self):
+        """Return a short human-readable summary table"""
+        snapshot = self.snapshot()
+        lines = [f"{'timer':<40}{'count':>8}{'mean ms':>10}{'max ms':>10}{'total s':>10}"]
+        for timer in snapshot["timers"]:
+            label = timer["name"] + "".join(f" {k}={v}" for k, v in timer["labels"].items())
+            lines.append(
+                f"{label:<40}{timer['count']:>8}{timer['mean_seconds'] * 1000:>10.1f}"
+                f"{timer['max_seconds'] * 1000:>10.1f}{timer['total_seconds']:>10.2f}"
+            )
+        for counter in snapshot["counters"]:
+            label = counter["name"] + "".join(f" {k}={v}" for k, v in counter["labels"].items())
+            lines.append(f"{label:<40}{_format_value(counter['value']):>8}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    # -- Profiling ----------------------------------------------------------
+
+    @contextmanager
+    def profile(self, name, mode=None, output_dir="."):
+        """Profile a block when enabled via mode or METRICS_PROFILE.
+
+        "cprofile" writes <name>.prof (open with pstats or snakeviz) and
+        prints the top functions; "sample" samples every thread's stack every
+        few milliseconds and writes <name>.folded in the collapsed-stack
+        format used by flame graph tools. With no mode this is a no-op.
+        """
+        mode = mode or os.getenv("METRICS_PROFILE", "").lower()
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                path = os.path.join(output_dir, f"{name}.prof")
+                profiler.dump_stats(path)
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(15)
+                print(f"Profile of {name} written to {path}\n{output.getvalue()}")
+        elif mode == "sample":
+            sampler = _StackSampler()
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                path = os.path.join(output_dir, f"{name}.folded")
+                sampler.write(path)
+                print(f"Sampled {sampler.samples} stacks of {name} into {path}")
+        else:
+            yield
+
+
+class _StackSampler(threading.Thread):
+    """Background thread that samples the stacks of all other threads"""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+# Default registry shared by every module in the process
+metrics = Metrics(os.getenv("METRICS_NAMESPACE", "app"))
+
+if os.getenv("METRICS_FILE"):
+    atexit.register(metrics.export, os.environ["METRICS_FILE"])
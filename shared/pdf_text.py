@@ -0,0 +1,102 @@
+"""Fast PDF text extraction: streamed, parallel and cached.
+
+Pages are extracted in parallel page ranges on a process pool, since
+PyPDF2's text extraction is pure Python and CPU bound. The extracted pages
+are cached on disk, keyed by a hash of the file's content and its mtime, so
+running a script again on an unchanged PDF does not parse it at all.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "PDF_TEXT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf_text"),
+)
+# Below this many pages per worker, process start-up costs more than it saves
+MIN_PAGES_PER_WORKER = 8
+
+
+def iter_pages(file_path, start=0, stop=None):
+    """Yield the text of each page in [start, stop) one page at a time"""
+    with open(file_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        stop = len(pdf_reader.pages) if stop is None else min(stop, len(pdf_reader.pages))
+        for page_number in range(start, stop):
+            yield pdf_reader.pages[page_number].extract_text() or ""
+
+
+def _extract_range(page_range):
+    file_path, start, stop = page_range
+    return list(iter_pages(file_path, start, stop))
+
+
+def extract_pages(file_path, workers=None):
+    """Return the text of every page, extracting page ranges in parallel"""
+    with open(file_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        total = len(pdf_reader.pages)
+        workers = min(workers or os.cpu_count() or 1, max(1, total // MIN_PAGES_PER_WORKER))
+        if workers <= 1:
+            return [page.extract_text() or "" for page in pdf_reader.pages]
+
+    # One contiguous range per worker; each worker opens the file itself
+    step = -(-total // workers)
+    ranges = [(file_path, start, min(start + step, total)) for start in range(0, total, step)]
+    pages = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for range_pages in executor.map(_extract_range, ranges):
+            pages.extend(range_pages)
+    return pages
+
+
+def _cache_key(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return f"{digest.hexdigest()}-{os.stat(file_path).st_mtime_ns}"
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path, pages):
+    # Write to a temporary file and rename so readers never see a partial entry
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(pages, file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def extract_text(file_path, workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the text of a PDF, using the on-disk cache when possible.
+
+    Pass cache_dir=None to always parse the file.
+    """
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, _cache_key(file_path) + ".json")
+        pages = _read_cache(cache_path)
+        if pages is not None:
+            return "".join(pages)
+
+    pages = extract_pages(file_path, workers)
+    if cache_path is not None:
+        _write_cache(cache_path, pages)
+    return "".join(pages)
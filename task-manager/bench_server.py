@@ -0,0 +1,118 @@
+"""Throughput and latency benchmark for the task manager service.
+
+Starts server.py on a temporary log file, opens many concurrent client
+connections that each run a mix of adds, completes, gets and page reads,
+and reports requests per second and latency percentiles per operation.
+
+Usage:
+    python bench_server.py --clients 64 --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from client import TaskClient
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_client(client_id, port, requests, latencies):
+    client = await TaskClient.connect(port=port)
+    my_ids = []
+    try:
+        for i in range(requests):
+            roll = random.random()
+            started = time.perf_counter()
+            if roll < 0.4 or not my_ids:
+                op = "add"
+                task = await client.add(f"client {client_id} task {i}")
+                my_ids.append(task["id"])
+            elif roll < 0.6:
+                op = "complete"
+                await client.complete(random.choice(my_ids))
+            elif roll < 0.8:
+                op = "get"
+                await client.get(random.choice(my_ids))
+            else:
+                op = "page"
+                await client.page(cursor=random.choice(my_ids), limit=20)
+            latencies.setdefault(op, []).append(time.perf_counter() - started)
+    finally:
+        await client.close()
+
+
+async def wait_for_server(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            client = await TaskClient.connect(port=port)
+            await client.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run_benchmark(port, clients, requests):
+    await wait_for_server(port)
+    latencies = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(i, port, requests, latencies) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    client = await TaskClient.connect(port=port)
+    stats = await client.stats()
+    await client.close()
+    return elapsed, latencies, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the task manager service.")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent client connections")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client")
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "tasks.log")
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--port", str(args.port), "--tasks-file", log_path],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            elapsed, latencies, stats = asyncio.run(run_benchmark(args.port, args.clients, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{args.clients} clients x {args.requests} requests: {total} requests in {elapsed:.2f}s")
+    print(f"Throughput: {total / elapsed:,.0f} requests/s")
+    if stats["batches"]:
+        print(
+            f"Group commit: {stats['batched_writes']} writes in {stats['batches']} fsynced batches "
+            f"({stats['batched_writes'] / stats['batches']:.1f} writes per fsync)"
+        )
+    print(f"{'op':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for op, samples in sorted(latencies.items()):
+        print(
+            f"{op:<10}{len(samples):>8}{percentile(samples, 0.50) * 1000:>10.2f}"
+            f"{percentile(samples, 0.95) * 1000:>10.2f}{percentile(samples, 0.99) * 1000:>10.2f}"
+            f"{statistics.mean(samples) * 1000:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
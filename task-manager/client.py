@@ -0,0 +1,62 @@
+"""Async client for the task manager service (see server.py)."""
+
+import asyncio
+import json
+
+
+class TaskClient:
+    """One connection to the task server; requests are answered in order"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        async with self._lock:
+            self.writer.write((json.dumps({"op": op, **fields}) + "\n").encode("utf-8"))
+            await self.writer.drain()
+            line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Task server closed the connection")
+        response = json.loads(line)
+        if not response.pop("ok"):
+            raise RuntimeError(response["error"])
+        return response
+
+    async def add(self, description):
+        return (await self.request("add", description=description))["task"]
+
+    async def add_many(self, descriptions):
+        return (await self.request("add_many", descriptions=list(descriptions)))["ids"]
+
+    async def complete(self, task_id):
+        return (await self.request("complete", id=task_id))["found"]
+
+    async def complete_many(self, task_ids):
+        return (await self.request("complete_many", ids=list(task_ids)))["count"]
+
+    async def delete(self, task_id):
+        return (await self.request("delete", id=task_id))["found"]
+
+    async def delete_many(self, task_ids):
+        return (await self.request("delete_many", ids=list(task_ids)))["count"]
+
+    async def get(self, task_id):
+        return (await self.request("get", id=task_id))["task"]
+
+    async def page(self, cursor=0, limit=20, status=None, contains=None):
+        response = await self.request("page", cursor=cursor, limit=limit, status=status, contains=contains)
+        return response["tasks"], response["next_cursor"]
+
+    async def stats(self):
+        return await self.request("stats")
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
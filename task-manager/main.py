@@ -1,33 +1,123 @@
-tasks = []
+import os
+from storage import TaskStore
+from transfer import export_tasks, import_tasks
+
+# Tasks are persisted to this log file between runs
+TASKS_FILE = os.getenv("TASKS_FILE", "tasks.log")
+PAGE_SIZE = 20
+
+store = None
+
+def get_store():
+    global store
+    if store is None:
+        store = TaskStore(TASKS_FILE)
+    return store
+
+def parse_ids(text):
+    # Accepts "3", "1,4,7" and ranges such as "10-20"
+    ids = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+            ids.extend(range(start, end + 1))
+        else:
+            ids.append(int(part))
+    return ids
 
 # Simple Task Manager Application
 def add_task(description):
-    task_id = tasks[-1]["id"] + 1 if tasks else 1
-    task = {"id": task_id, "description": description, "completed":
-    False}
-    tasks.append(task)
-    print(f"Task '{description}' added with ID {task_id}.")
-
-def view_tasks():
-    if not tasks:
+    task = get_store().add(description)
+    print(f"Task '{description}' added with ID {task.id}.")
+
+def add_tasks(descriptions):
+    ids = get_store().add_many(descriptions)
+    if ids:
+        print(f"Added {len(ids)} tasks with IDs {ids[0]}-{ids[-1]}.")
+    else:
+        print("No tasks added.")
+    return ids
+
+def view_tasks(status=None, cursor=0, page_size=PAGE_SIZE, contains=None):
+    # Prints one page of tasks and returns the cursor for the next page (None at the end)
+    tasks, next_cursor = get_store().page(cursor, page_size, status, contains)
+    if not tasks and not cursor:
         print("No tasks available.")
-        return
+        return None
     for task in tasks:
-        status = "Completed" if task["completed"] else "Pending"
-        print(f"ID: {task['id']}, Description: {task['description']}, Status: {status}")
+        task_status = "Completed" if task.completed else "Pending"
+        print(f"ID: {task.id}, Description: {task.description}, Status: {task_status}")
+    return next_cursor
 
 def complete_task(task_id):
-    for task in tasks:
-        if task["id"] == task_id:
-            task["completed"] = True
-            print(f"Task ID {task_id} marked as completed.")
-            return
+    if get_store().complete(task_id):
+        print(f"Task ID {task_id} marked as completed.")
+        return
     print(f"Task ID {task_id} not found.")
 
+def complete_tasks(task_ids):
+    count = get_store().complete_many(task_ids)
+    print(f"{count} tasks marked as completed.")
+    return count
+
 def delete_task(task_id):
-    global tasks
-    tasks = [task for task in tasks if task["id"] != task_id]
-    print(f"Task ID {task_id} deleted.")
+    if get_store().delete(task_id):
+        print(f"Task ID {task_id} deleted.")
+        return
+    print(f"Task ID {task_id} not found.")
+
+def delete_tasks(task_ids):
+    count = get_store().delete_many(task_ids)
+    print(f"{count} tasks deleted.")
+    return count
+
+def import_from_file(path):
+    store = get_store()
+    before = len(store)
+    try:
+        count = import_tasks(store, path)
+    except (OSError, ValueError):
+        # Tasks read before the error are kept; say how many
+        print(f"{len(store) - before} tasks were imported before the error.")
+        raise
+    print(f"Imported {count} tasks from {path}.")
+
+def export_to_file(path, status=None):
+    store = get_store()
+    if status == "pending":
+        tasks = store.pending()
+    elif status == "completed":
+        tasks = store.completed()
+    else:
+        tasks = iter(store)
+    count = export_tasks(tasks, path)
+    print(f"Exported {count} tasks to {path}.")
+
+def browse_tasks():
+    status = input("Filter by status (all/pending/completed) [all]: ").strip().lower()
+    status = status if status in ("pending", "completed") else None
+    contains = input("Filter by text (leave empty for none): ").strip() or None
+    cursor = 0
+    while True:
+        cursor = view_tasks(status, cursor, PAGE_SIZE, contains)
+        if cursor is None:
+            break
+        if input("Press Enter for more, or 'q' to stop: ").strip().lower() == "q":
+            break
+
+def run_with_ids(prompt, single, bulk):
+    try:
+        task_ids = parse_ids(input(prompt))
+    except ValueError:
+        print("Invalid task ID, please enter numbers such as 3, 1,4,7 or 10-20.")
+        return
+    if len(task_ids) == 1:
+        single(task_ids[0])
+    elif task_ids:
+        bulk(task_ids)
 
 def main():
     while True:
@@ -36,26 +126,39 @@ def main():
         print("2. View Tasks")
         print("3. Complete Task")
         print("4. Delete Task")
-        print("5. Exit")
-        
+        print("5. Import Tasks")
+        print("6. Export Tasks")
+        print("7. Exit")
+
         choice = input("Choose an option: ")
-        
+
         if choice == "1":
             description = input("Enter task description: ")
             add_task(description)
         elif choice == "2":
-            view_tasks()
+            browse_tasks()
         elif choice == "3":
-            task_id = int(input("Enter task ID to complete: "))
-            complete_task(task_id)
+            run_with_ids("Enter task ID(s) to complete: ", complete_task, complete_tasks)
         elif choice == "4":
-            task_id = int(input("Enter task ID to delete: "))
-            delete_task(task_id)
+            run_with_ids("Enter task ID(s) to delete: ", delete_task, delete_tasks)
         elif choice == "5":
+            path = input("Enter CSV or JSONL file to import: ").strip()
+            try:
+                import_from_file(path)
+            except (OSError, ValueError) as e:
+                print(f"Import failed: {e}")
+        elif choice == "6":
+            path = input("Enter CSV or JSONL file to export to: ").strip()
+            try:
+                export_to_file(path)
+            except (OSError, ValueError) as e:
+                print(f"Export failed: {e}")
+        elif choice == "7":
+            get_store().close()
             print("Exiting Task Manager.")
             break
         else:
             print("Invalid option, please try again.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,246 @@
+"""Task manager service mode: serve the task operations to many clients.
+
+The server speaks a line protocol over TCP: each request is one JSON object
+on its own line and each response is one JSON line, in request order.
+
+    {"op": "add", "description": "Write report"}
+    {"ok": true, "task": {"id": 1, "description": "Write report", "completed": false}}
+
+Operations: add, add_many, complete, complete_many, delete, delete_many,
+get, page and stats (see apply_write and apply_read for their fields).
+
+Everything runs on one asyncio event loop, so reads never race with writes
+and need no locks. Writes are not applied by the connection handlers
+directly: they are queued for a single writer task, which applies every
+queued write as one batch and then flushes and fsyncs the log once for the
+whole batch (group commit). A write is only acknowledged after its batch is
+on disk. While one batch is being fsynced, new writes queue up for the next.
+
+Reads only see committed data: a read that arrives while a batch is being
+fsynced waits for that commit to finish. If an fsync fails, memory holds
+changes that may not be on disk, so the server stops serving requests and
+must be restarted, which rebuilds its state from the log.
+
+Compaction never blocks the event loop: the compacted log is written by a
+worker thread from a snapshot while writes continue, and the writer swaps it
+in between two batches.
+
+Usage:
+    python server.py --host 127.0.0.1 --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+from storage import TaskStore
+
+WRITE_OPS = {"add", "add_many", "complete", "complete_many", "delete", "delete_many"}
+MAX_BATCH = 1024
+
+
+class StorageFailed(Exception):
+    """An fsync failed; the in-memory state can no longer be trusted"""
+
+
+class TaskServer:
+    """Line-protocol task server with a single writer and group commit"""
+
+    def __init__(self, store, max_batch=MAX_BATCH):
+        self.store = store
+        self.max_batch = max_batch
+        self.writes = asyncio.Queue()
+        self.batches = 0
+        self.batched_writes = 0
+        self.compactions = 0
+        self.failed = None      # StorageFailed once an fsync has failed
+        self.committed = asyncio.Event()  # cleared while a batch is being applied and fsynced
+        self.committed.set()
+        self.compaction = None  # background task writing a compacted log
+
+    # -- Request handling ---------------------------------------------------
+
+    def apply_write(self, request):
+        op = request["op"]
+        store = self.store
+        if op == "add":
+            return {"task": store.add(str(request["description"])).to_dict()}
+        if op == "add_many":
+            return {"ids": store.add_many([str(d) for d in request["descriptions"]])}
+        if op == "complete":
+            return {"found": store.complete(int(request["id"]))}
+        if op == "complete_many":
+            return {"count": store.complete_many([int(i) for i in request["ids"]])}
+        if op == "delete":
+            return {"found": store.delete(int(request["id"]))}
+        if op == "delete_many":
+            return {"count": store.delete_many([int(i) for i in request["ids"]])}
+        raise ValueError(f"Unknown write operation: {op}")
+
+    def apply_read(self, request):
+        op = request["op"]
+        store = self.store
+        if op == "get":
+            task = store.get(int(request["id"]))
+            return {"task": task.to_dict() if task else None}
+        if op == "page":
+            tasks, next_cursor = store.page(
+                int(request.get("cursor", 0)),
+                int(request.get("limit", 20)),
+                request.get("status"),
+                request.get("contains"),
+            )
+            return {"tasks": [task.to_dict() for task in tasks], "next_cursor": next_cursor}
+        if op == "stats":
+            return {
+                "tasks": len(store),
+                "pending": store.count(False),
+                "completed": store.count(True),
+                "batches": self.batches,
+                "batched_writes": self.batched_writes,
+                "compactions": self.compactions,
+            }
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def handle_request(self, request):
+        if self.failed is not None:
+            raise self.failed
+        if request.get("op") in WRITE_OPS:
+            future = asyncio.get_running_loop().create_future()
+            await self.writes.put((request, future))
+            return await future
+        # Never serve writes that are applied in memory but not yet on disk
+        await self.committed.wait()
+        if self.failed is not None:
+            raise self.failed
+        return self.apply_read(request)
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = {"ok": True, **await self.handle_request(request)}
+                except Exception as e:
+                    response = {"ok": False, "error": str(e) or type(e).__name__}
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # -- Single writer with group commit ------------------------------------
+
+    async def run_writer(self):
+        while True:
+            batch = [await self.writes.get()]
+            while len(batch) < self.max_batch and not self.writes.empty():
+                batch.append(self.writes.get_nowait())
+
+            self.committed.clear()
+            try:
+                await self.commit(batch)
+            except Exception as e:
+                # Whatever goes wrong, fail this batch and keep the writer alive
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                self.committed.set()
+            # Let reads that waited for this commit run before the next batch
+            await asyncio.sleep(0)
+
+    async def commit(self, batch):
+        if self.failed is not None:
+            raise self.failed
+
+        results = []
+        for request, future in batch:
+            try:
+                results.append((future, {"result": self.apply_write(request)}))
+            except Exception as e:
+                results.append((future, {"error": e}))
+
+        # One flush and fsync for the whole batch, in a worker thread
+        try:
+            self.store.flush(sync=False)
+            await asyncio.get_running_loop().run_in_executor(None, self.store.fsync)
+        except OSError as e:
+            self.failed = StorageFailed(f"Writing the task log failed ({e}); restart the server")
+            raise self.failed from e
+
+        self.batches += 1
+        self.batched_writes += len(batch)
+        for future, outcome in results:
+            if future.done():
+                continue
+            if "error" in outcome:
+                future.set_exception(outcome["error"])
+            else:
+                future.set_result(outcome["result"])
+        await self.maintain_log()
+
+    async def maintain_log(self):
+        # Called by the writer between batches, the only point where the new
+        # log can be swapped in without racing an fsync of the old one
+        loop = asyncio.get_running_loop()
+        if self.compaction is None:
+            if self.store.needs_compaction():
+                snapshot = self.store.begin_compaction()
+                self.compaction = loop.run_in_executor(None, self.store.write_compaction, snapshot)
+        elif self.compaction.done():
+            compaction, self.compaction = self.compaction, None
+            try:
+                written = compaction.result()
+            except OSError as e:
+                # The old log is untouched, so keep serving from it
+                print(f"Log compaction failed: {e}")
+                self.store.abort_compaction()
+                return
+            # The writer waits here, so nothing is written during the swap
+            try:
+                await loop.run_in_executor(None, self.store.end_compaction, written)
+            except Exception as e:
+                self.store.abort_compaction()
+                self.failed = StorageFailed(f"Swapping in the compacted log failed ({e}); restart the server")
+                raise self.failed from e
+            self.compactions += 1
+
+
+async def serve(host, port, path):
+    store = TaskStore(path, autoflush=False, auto_compact=False)
+    server = TaskServer(store)
+    writer_task = asyncio.create_task(server.run_writer())
+    tcp_server = await asyncio.start_server(server.handle_client, host, port, limit=2 ** 24)
+    print(f"Task Manager service listening on {host}:{port} ({len(store)} tasks loaded from {path})")
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        writer_task.cancel()
+        if server.compaction is not None:
+            await asyncio.wait([server.compaction])
+            store.abort_compaction()
+        store.flush(sync=True)
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the task manager to concurrent clients.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tasks-file", default=os.getenv("TASKS_FILE", "tasks.log"))
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.tasks_file))
+    except KeyboardInterrupt:
+        print("Task Manager service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Indexed, persistent task storage for the task manager.
+
+Tasks live in a list of compact records ("slots") in id order. A dict maps
+each task id to its slot, so lookups, completion and deletion are O(1), and
+two status indexes hold the ids of pending and completed tasks so either
+group can be listed without scanning every task. Each status also keeps its
+ids sorted, so a page of one status is found by seeking to the cursor.
+
+Every change is appended to a log file, one line per operation:
+
+    A <id> <completed 0|1> <json description>   add a task
+    C <id>                                       mark a task completed
+    D <id>                                       delete a task
+    N <next id>                                  next id to assign
+
+On startup the log is replayed to rebuild the store. When most of the log
+describes tasks that have since been completed or deleted, it is compacted:
+rewritten with a single line per live task, then atomically swapped in.
+Callers that cannot block for a full rewrite (the server) turn automatic
+compaction off and use begin_compaction/write_compaction/end_compaction to
+write the new log in another thread while writes continue.
+"""
+
+import heapq
+import os
+from array import array
+from bisect import bisect_right, insort
+from json.decoder import scanstring
+from json.encoder import encode_basestring_ascii
+
+
+class Task:
+    """A single task record"""
+
+    __slots__ = ("id", "description", "completed")
+
+    def __init__(self, task_id, description, completed=False):
+        self.id = task_id
+        self.description = description
+        self.completed = completed
+
+    def to_dict(self):
+        return {"id": self.id, "description": self.description, "completed": self.completed}
+
+    def __repr__(self):
+        return f"Task(id={self.id!r}, description={self.description!r}, completed={self.completed!r})"
+
+
+class _SortedIds:
+    """Task ids in ascending order that a page can seek into by cursor.
+
+    Ids that arrive in order are appended to a flat array. Others go into a
+    sorted buffer that is merged into the array once it holds more than
+    1/16 of its length (and at least 1024 ids), which keeps inserts cheap. Removals are lazy: readers skip ids that
+    are no longer live, and the array is rebuilt from the live ids once
+    stale ids outnumber a quarter of them.
+    """
+
+    __slots__ = ("ids", "buffer", "stale")
+
+    def __init__(self, ids=()):
+        self.ids = array("q", ids)
+        self.buffer = []
+        self.stale = 0
+
+    def add(self, task_id):
+        ids, buffer = self.ids, self.buffer
+        if (not ids or task_id > ids[-1]) and (not buffer or task_id > buffer[-1]):
+            ids.append(task_id)
+            return
+        insort(buffer, task_id)
+        if len(buffer) > max(1024, len(ids) // 16):
+            # Two sorted runs: timsort merges them in linear time
+            self.ids = array("q", sorted(ids + array("q", buffer)))
+            self.buffer = []
+
+    def discard(self, live):
+        """Note that one id left the live set it mirrors"""
+        self.stale += 1
+        if self.stale > 1024 and self.stale * 4 > len(live):
+            self.ids = array("q", sorted(live))
+            self.buffer = []
+            self.stale = 0
+
+    def iter_from(self, cursor):
+        """Ids greater than cursor in ascending order, possibly including stale ones"""
+        ids, buffer = self.ids, self.buffer
+        start = bisect_right(ids, cursor)
+        tail = (ids[i] for i in range(start, len(ids)))
+        if not buffer:
+            return tail
+        return heapq.merge(tail, (buffer[i] for i in range(bisect_right(buffer, cursor), len(buffer))))
+
+
+class TaskStore:
+    """Task storage with an id index, status indexes and an append-only log"""
+
+    def __init__(self, path=None, sync=False, compact_min_records=10000, compact_ratio=1.0,
+                 autoflush=True, auto_compact=True):
+        """Open the store, replaying the log at path if it exists.
+
+        path=None keeps tasks in memory only. With sync=True every write is
+        fsynced before returning. The log is compacted once its obsolete
+        records exceed both compact_min_records and compact_ratio times the
+        number of live tasks. With autoflush=False writes stay in the file
+        buffer until flush() is called, so callers can group-commit many
+        operations with one flush and fsync. With auto_compact=False the log
+        is only compacted when the caller asks for it.
+        """
+        self.path = path
+        self.sync = sync
+        self.autoflush = autoflush
+        self.auto_compact = auto_compact
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+
+        self._slots = []        # Task records in id order; None marks a deleted task
+        self._slot_ids = array("q")  # id of each slot, kept for deleted slots too
+        self._index = {}        # task id -> position in _slots
+        self._pending = {}      # ids of pending tasks (dict used as an ordered set)
+        self._completed = {}    # ids of completed tasks
+        self._sorted = None     # completed flag -> _SortedIds, built after replay
+        self._next_id = 1
+        self._holes = 0         # deleted slots not yet reclaimed
+        self._log_records = 0   # lines currently in the log
+        self._log = None
+        self._compacting = None  # lines written while a compaction is in progress
+
+        if path is not None:
+            if os.path.exists(path):
+                self._replay()
+            self._log = open(path, "a", encoding="utf-8")
+        self._sorted = {False: _SortedIds(sorted(self._pending)), True: _SortedIds(sorted(self._completed))}
+
+    # -- Log handling -------------------------------------------------------
+
+    def _replay(self):
+        # Hot loop at startup: index updates for "A" records are inlined
+        slots, index, slot_ids = self._slots, self._index, self._slot_ids
+        pending, completed_ids = self._pending, self._completed
+        torn = None
+        with open(self.path, "r", encoding="utf-8") as log:
+            for line in log:
+                if not line.endswith("\n"):
+                    torn = line  # torn final write from a crash; ignore it
+                    break
+                self._log_records += 1
+                op = line[0]
+                if op == "A":
+                    _, task_id, completed, description = line.split(" ", 3)
+                    task_id = int(task_id)
+                    completed = completed == "1"
+                    index[task_id] = len(slots)
+                    slots.append(Task(task_id, scanstring(description, 1)[0], completed))
+                    slot_ids.append(task_id)
+                    (completed_ids if completed else pending)[task_id] = None
+                    if task_id >= self._next_id:
+                        self._next_id = task_id + 1
+                elif op == "C":
+                    self._mark_completed(int(line[2:]))
+                elif op == "D":
+                    self._remove(int(line[2:]))
+                elif op == "N":
+                    self._next_id = max(self._next_id, int(line[2:]))
+
+        if torn is not None:
+            # Cut the torn bytes off so the next record starts on its own line
+            with open(self.path, "r+b") as log:
+                log.truncate(os.path.getsize(self.path) - len(torn.encode("utf-8")))
+
+    def _write(self, lines):
+        if self._log is None:
+            return
+        self._log.write("".join(lines))
+        if self.autoflush:
+            self.flush()
+        self._log_records += len(lines)
+        if self._compacting is not None:
+            self._compacting.extend(lines)
+        elif self.auto_compact and self.needs_compaction():
+            self.compact()
+
+    def needs_compaction(self):
+        obsolete = self._log_records - len(self._index)
+        return obsolete > self.compact_min_records and obsolete > self.compact_ratio * len(self._index)
+
+    @staticmethod
+    def _add_record(task):
+        return f"A {task.id} {int(task.completed)} {encode_basestring_ascii(task.description)}\n"
+
+    def compact(self):
+        """Rewrite the log with one record per live task and reclaim slots"""
+        self._reclaim_slots()
+
+        if self.path is None:
+            return
+        self.end_compaction(self.write_compaction(self.begin_compaction()))
+
+    def begin_compaction(self):
+        """Start a compaction and return the snapshot to pass to write_compaction().
+
+        Until end_compaction() or abort_compaction(), every log line written
+        is also kept in memory so it can be appended to the new log.
+        """
+        if self._compacting is not None:
+            raise RuntimeError("A compaction is already in progress")
+        self._compacting = []
+        return self._next_id, list(self._slots)
+
+    def write_compaction(self, snapshot):
+        """Write the compacted log to a temporary file and return its path.
+
+        Only reads the snapshot, so it can run in another thread while the
+        store keeps changing. Tasks completed or deleted after the snapshot
+        was taken are fixed up by the lines replayed after it.
+        """
+        next_id, slots = snapshot
+        temp_path = self.path + ".compact"
+        with open(temp_path, "w", encoding="utf-8") as log:
+            log.write(f"N {next_id}\n")
+            records = 1
+            for task in slots:
+                if task is not None:
+                    log.write(self._add_record(task))
+                    records += 1
+            log.flush()
+            os.fsync(log.fileno())
+        return temp_path, records
+
+    def end_compaction(self, written):
+        """Append the lines written since begin_compaction() and swap the new log in.
+
+        Only does file I/O, so it can run in another thread as long as
+        nothing is written to the store until it returns.
+        """
+        temp_path, records = written
+        lines, self._compacting = self._compacting, None
+        self.flush(sync=False)
+        with open(temp_path, "a", encoding="utf-8") as log:
+            log.write("".join(lines))
+            log.flush()
+            os.fsync(log.fileno())
+        os.replace(temp_path, self.path)
+        # Switch files only once the new log is in place, so a failed rename
+        # leaves the old log open and in use
+        old_log, self._log = self._log, open(self.path, "a", encoding="utf-8")
+        old_log.close()
+        self._log_records = records + len(lines)
+
+    def abort_compaction(self):
+        """Give up on a compaction; the current log stays in use"""
+        self._compacting = None
+        if self.path is not None and os.path.exists(self.path + ".compact"):
+            os.remove(self.path + ".compact")
+
+    def flush(self, sync=None):
+        """Flush buffered log writes to the OS, and fsync if sync (default: self.sync)"""
+        if self._log is None:
+            return
+        self._log.flush()
+        if self.sync if sync is None else sync:
+            self.fsync()
+
+    def fsync(self):
+        """Force flushed log writes to disk; safe to call from another thread"""
+        if self._log is not None:
+            os.fsync(self._log.fileno())
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    # -- In-memory index maintenance ----------------------------------------
+
+    def _reclaim_slots(self):
+        self._slots = [task for task in self._slots if task is not None]
+        self._index = {task.id: slot for slot, task in enumerate(self._slots)}
+        self._slot_ids = array("q", (task.id for task in self._slots))
+        self._holes = 0
+
+    def _insert(self, task):
+        self._index[task.id] = len(self._slots)
+        self._slots.append(task)
+        self._slot_ids.append(task.id)
+        (self._completed if task.completed else self._pending)[task.id] = None
+        if self._sorted is not None:
+            self._sorted[task.completed].add(task.id)
+        self._next_id = max(self._next_id, task.id + 1)
+
+    def _mark_completed(self, task_id):
+        slot = self._index.get(task_id)
+        if slot is None:
+            return False
+        task = self._slots[slot]
+        if not task.completed:
+            task.completed = True
+            del self._pending[task_id]
+            self._completed[task_id] = None
+            if self._sorted is not None:
+                self._sorted[False].discard(self._pending)
+                self._sorted[True].add(task_id)
+        return True
+
+    def _remove(self, task_id):
+        slot = self._index.pop(task_id, None)
+        if slot is None:
+            return False
+        task = self._slots[slot]
+        self._slots[slot] = None
+        self._holes += 1
+        live = self._completed if task.completed else self._pending
+        live.pop(task_id, None)
+        if self._sorted is not None:
+            self._sorted[task.completed].discard(live)
+        return True
+
+    # -- Public operations --------------------------------------------------
+
+    def add(self, description):
+        """Add a pending task and return it"""
+        task = Task(self._next_id, description)
+        self._insert(task)
+        self._write([self._add_record(task)])
+        return task
+
+    def complete(self, task_id):
+        """Mark a task completed; return False if it does not exist"""
+        task = self.get(task_id)
+        if task is None:
+            return False
+        if not task.completed:
+            self._mark_completed(task_id)
+            self._write([f"C {task_id}\n"])
+        return True
+
+    def delete(self, task_id):
+        """Delete a task; return False if it does not exist"""
+        if not self._remove(task_id):
+            return False
+        self._write([f"D {task_id}\n"])
+        # Reclaim deleted slots once they outnumber live tasks
+        if self._holes > len(self._index):
+            self._reclaim_slots()
+        return True
+
+    def add_many(self, descriptions, batch_size=10000):
+        """Add pending tasks from any iterable of descriptions; return their ids"""
+        return self.load(((description, False) for description in descriptions), batch_size)
+
+    def load(self, records, batch_size=10000):
+        """Add tasks from an iterable of (description, completed) pairs.
+
+        Records are consumed lazily and written to the log in batches, so
+        very large imports stream through with bounded memory use. If the
+        records raise partway, the tasks added before the error are still
+        written to the log, so memory and the log agree.
+        """
+        ids = []
+        lines = []
+        try:
+            for description, completed in records:
+                task = Task(self._next_id, description, bool(completed))
+                # Build the log line first, so a task that cannot be logged
+                # is never added to memory
+                line = self._add_record(task)
+                self._insert(task)
+                ids.append(task.id)
+                lines.append(line)
+                if len(lines) >= batch_size:
+                    self._write(lines)
+                    lines = []
+        finally:
+            if lines:
+                self._write(lines)
+        return ids
+
+    def complete_many(self, task_ids):
+        """Mark many tasks completed with one log write; return how many changed"""
+        lines = []
+        for task_id in task_ids:
+            task = self.get(task_id)
+            if task is not None and not task.completed:
+                self._mark_completed(task_id)
+                lines.append(f"C {task_id}\n")
+        if lines:
+            self._write(lines)
+        return len(lines)
+
+    def delete_many(self, task_ids):
+        """Delete many tasks with one log write; return how many were deleted"""
+        lines = [f"D {task_id}\n" for task_id in task_ids if self._remove(task_id)]
+        if lines:
+            self._write(lines)
+        if self._holes > len(self._index):
+            self._reclaim_slots()
+        return len(lines)
+
+    def page(self, cursor=0, limit=20, status=None, contains=None):
+        """Return (tasks, next_cursor) for one page of tasks in id order.
+
+        cursor is the id of the last task on the previous page (0 for the
+        first page) and next_cursor is None once there are no more tasks.
+        status ("pending" or "completed") and contains (a case-insensitive
+        substring of the description) filter the listing. An unfiltered page
+        costs O(limit) after an O(log n) seek to the cursor, and so does a
+        page filtered by status, plus any ids it skips that have recently
+        left that status (bounded by a quarter of the status size, and
+        usually far fewer). A contains filter also reads every task it
+        rejects on the way to a full page.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if status not in (None, "pending", "completed"):
+            raise ValueError(f"Unknown status: {status!r}")
+        needle = contains.lower() if contains else None
+
+        if status is not None:
+            completed = status == "completed"
+            live = self._completed if completed else self._pending
+            tasks = []
+            for task_id in self._sorted[completed].iter_from(cursor):
+                if task_id not in live:
+                    continue  # left this status since it was indexed
+                task = self.get(task_id)
+                if needle is not None and needle not in task.description.lower():
+                    continue
+                if len(tasks) == limit:
+                    return tasks, tasks[-1].id
+                tasks.append(task)
+            return tasks, None
+
+        tasks = []
+        slots = self._slots
+        for slot in range(bisect_right(self._slot_ids, cursor), len(slots)):
+            task = slots[slot]
+            if task is None or (needle is not None and needle not in task.description.lower()):
+                continue
+            if len(tasks) == limit:
+                return tasks, tasks[-1].id
+            tasks.append(task)
+        return tasks, None
+
+    def get(self, task_id):
+        slot = self._index.get(task_id)
+        return None if slot is None else self._slots[slot]
+
+    def pending(self):
+        """Pending tasks in id order"""
+        for task_id in self._pending:
+            yield self._slots[self._index[task_id]]
+
+    def completed(self):
+        """Completed tasks, in completion order only since the last compaction.
+
+        Compaction writes every task with its completed flag, so tasks
+        completed before it come back from replay in id order, followed by
+        later completions in the order they happened.
+        """
+        for task_id in self._completed:
+            yield self._slots[self._index[task_id]]
+
+    def __iter__(self):
+        """All tasks in id order"""
+        return (task for task in self._slots if task is not None)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, task_id):
+        return task_id in self._index
+
+    def count(self, completed):
+        return len(self._completed if completed else self._pending)
@@ -0,0 +1,82 @@
+"""Streaming import and export of tasks as CSV or JSONL files.
+
+Both formats carry the same fields as a task: id, description and
+completed. On import only description (required) and completed (optional,
+default false) are read; imported tasks are given new ids.
+"""
+
+import csv
+import json
+import os
+
+FIELDS = ["id", "description", "completed"]
+TRUE_VALUES = {"1", "true", "yes", "y", "completed", "done"}
+
+
+def _file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file type '{extension}'; use .csv or .jsonl")
+
+
+def _parse_completed(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+def _record(row, line_number):
+    # Reject rows that would otherwise fail later with a TypeError
+    if not isinstance(row, dict):
+        raise ValueError(f"Invalid task on line {line_number}: expected an object")
+    description = row.get("description")
+    if not isinstance(description, str):
+        raise ValueError(f"Invalid task on line {line_number}: description must be text")
+    return description, _parse_completed(row.get("completed", False))
+
+
+def read_records(path):
+    """Yield (description, completed) pairs from a CSV or JSONL file"""
+    file_format = _file_format(path)
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            if not reader.fieldnames or "description" not in reader.fieldnames:
+                raise ValueError("CSV file needs a 'description' column")
+            for row in reader:
+                yield _record(row, reader.line_num)
+        else:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Invalid task on line {line_number}: {e}") from e
+                yield _record(row, line_number)
+
+
+def import_tasks(store, path, batch_size=10000):
+    """Add every task in a CSV or JSONL file to the store; return the count"""
+    return len(store.load(read_records(path), batch_size))
+
+
+def export_tasks(tasks, path):
+    """Write tasks (any iterable of Task records) to a CSV or JSONL file"""
+    file_format = _file_format(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            for task in tasks:
+                writer.writerow([task.id, task.description, "true" if task.completed else "false"])
+                count += 1
+        else:
+            for task in tasks:
+                file.write(json.dumps(task.to_dict()) + "\n")
+                count += 1
+    return count